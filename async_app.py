@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import quart
+
+# The encoder modules import each other as top-level modules, so make them importable from here.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "encoder"))
+
+from encoder import DATA_DIRECTORY, ENCODING_VERSION, FILE_NAMES, Person, load_family  # noqa: E402
+from gen_dot import clear_dot_cache, generate_dot  # noqa: E402
+from layout import layout_family  # noqa: E402
+
+
+# Number of people serialized per chunk when streaming a family as JSON.
+JSON_CHUNK_SIZE = 64
+
+# Create the application.
+APP = quart.Quart(__name__)
+
+# Loading and DOT rendering are blocking, so they are run here instead of on the event loop.
+EXECUTOR = ThreadPoolExecutor()
+
+# Family builds keyed by file number, each stored with the ETag of the file it was built from. A build is stored
+# as soon as it starts, so concurrent requests for the same family all await the one load instead of each
+# starting their own, and it is replaced once the file on disk changes.
+_family_builds: Dict[int, Tuple[str, asyncio.Future]] = {}
+
+
+def family_etag(file_number: int) -> str:
+    stat = os.stat(os.path.join(DATA_DIRECTORY, FILE_NAMES[file_number - 1]))
+    return f"v{ENCODING_VERSION}-{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def build_family(file_number: int) -> Tuple[Optional[str], Dict[str, Person]]:
+    family = load_family(file_number, FILE_NAMES[file_number - 1])
+    # The DOT fragments cached for the previous build were made from people this build replaces.
+    clear_dot_cache(file_number)
+    return family
+
+
+async def get_family(file_number: int) -> Tuple[Optional[str], Dict[str, Person]]:
+    etag = family_etag(file_number)
+    build_etag, build = _family_builds.get(file_number, (None, None))
+
+    if build is None or build_etag != etag:
+        loop = asyncio.get_running_loop()
+        build = loop.run_in_executor(EXECUTOR, build_family, file_number)
+        _family_builds[file_number] = (etag, build)
+
+    try:
+        # Shield the build so one client disconnecting doesn't cancel it for everyone else waiting on it.
+        return await asyncio.shield(build)
+    except Exception:
+        if _family_builds.get(file_number, (None, None))[1] is build and build.done():
+            del _family_builds[file_number]
+        raise
+
+
+async def stream_family_json(root_uuid: Optional[str], generations: List[int],
+                             people: Iterable[Person]) -> AsyncIterator[bytes]:
+    yield ('{"root": ' + json.dumps(root_uuid) + ', "generations": ' + json.dumps(generations) + ', "nodes": {').encode()
+
+    chunk = []
+    for i, person in enumerate(people):
+        chunk.append(("" if i == 0 else ", ") + json.dumps(person.uuid) + ": " + json.dumps(person.to_encodable_dict()))
+
+        if len(chunk) == JSON_CHUNK_SIZE:
+            yield "".join(chunk).encode()
+            chunk = []
+            # Give other requests a turn between chunks.
+            await asyncio.sleep(0)
+
+    yield ("".join(chunk) + "}}").encode()
+
+
+@APP.route('/')
+async def index():
+    return await quart.render_template('index.html', bundle=True)
+
+
+@APP.route('/families')
+async def families():
+    # The ETags let clients tell whether their cached subgraphs are current without requesting them.
+    return {"families": [{"id": i, "etag": family_etag(i)} for i in range(1, len(FILE_NAMES) + 1)]}
+
+
+@APP.route('/families/<int:file_number>')
+async def family(file_number: int):
+    if not 1 <= file_number <= len(FILE_NAMES):
+        quart.abort(404)
+
+    # Clients can fetch one generation at a time with ?generation=<n> rather than the whole family.
+    generation = quart.request.args.get("generation", type=int)
+    etag = family_etag(file_number) + ("" if generation is None else f"-g{generation}")
+
+    if quart.request.if_none_match.contains(etag):
+        response = quart.Response(b"", status=304)
+        response.set_etag(etag)
+        return response
+
+    root_uuid, people = await get_family(file_number)
+
+    generations = sorted({person.generation for person in people.values()}, reverse=True)
+    if generation is not None:
+        selected = [person for person in people.values() if person.generation == generation]
+    else:
+        selected = list(people.values())
+
+    response = quart.Response(stream_family_json(root_uuid, generations, selected), mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+
+@APP.route('/families/<int:file_number>/dot')
+async def family_dot(file_number: int):
+    if not 1 <= file_number <= len(FILE_NAMES):
+        quart.abort(404)
+
+    root_uuid, people = await get_family(file_number)
+
+    loop = asyncio.get_running_loop()
+    output = await loop.run_in_executor(EXECUTOR, generate_dot, {str(file_number): root_uuid}, people, file_number)
+
+    return quart.Response(output, mimetype="text/vnd.graphviz")
+
+
+@APP.route('/families/<int:file_number>/layout')
+async def family_layout(file_number: int):
+    if not 1 <= file_number <= len(FILE_NAMES):
+        quart.abort(404)
+
+    root_uuid, people = await get_family(file_number)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(EXECUTOR, layout_family, people.values())
+
+
+if __name__ == '__main__':
+    APP.run()
@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# Only the standard library is imported here, so each command costs an interpreter start and a round trip to the
+# daemon rather than a pandas import and a full cohort load.
+
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), "family-encoder.sock")
+
+
+class DaemonError(Exception):
+    pass
+
+
+def send_command(request: dict, socket_path: str = SOCKET_PATH) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(request).encode() + b"\n")
+
+        with connection.makefile("rb") as f:
+            response = json.loads(f.readline())
+
+    if not response["ok"]:
+        raise DaemonError(response["error"])
+
+    return response["result"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Talk to a running daemon.py")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status")
+
+    export = commands.add_parser("export", help="write the cohort as encoder.py does")
+    export.add_argument("output", nargs="?", default="output.json")
+
+    dot = commands.add_parser("dot", help="write DOT files as gen_dot.py does")
+    dot.add_argument("families", nargs="*", type=int, help="defaults to every family")
+
+    query = commands.add_parser("query")
+    query.add_argument("--family", type=int)
+    query.add_argument("--relationship")
+    query.add_argument("--disease")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "status":
+            print(json.dumps(send_command({"command": "status"}, args.socket), indent=2))
+        elif args.command == "export":
+            result = send_command({"command": "export"}, args.socket)
+            with open(args.output, "w") as f:
+                f.write(json.dumps(result))
+        elif args.command == "dot":
+            families = args.families or send_command({"command": "status"}, args.socket)["families"]
+            for family in families:
+                result = send_command({"command": "dot", "family": family}, args.socket)
+                with open(f"out{family}.gv", "w") as f:
+                    f.write(result["dot"])
+        elif args.command == "query":
+            request = {"command": "query", "family": args.family, "relationship": args.relationship,
+                       "disease": args.disease}
+            print(json.dumps(send_command(request, args.socket)["nodes"], indent=2))
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No daemon is listening on {args.socket}; start one with python daemon.py", file=sys.stderr)
+        return 1
+    except DaemonError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
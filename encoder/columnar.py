@@ -0,0 +1,174 @@
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+
+from encoder import get_roots_and_people, Person
+from enums import Gender
+from interning import STRINGS
+
+
+PARENT = "parent"
+MATE = "mate"
+SIBLING = "sibling"
+TWIN = "twin"
+
+EDGE_KINDS = [PARENT, MATE, SIBLING, TWIN]
+
+NODE_SCHEMA = pyarrow.schema([
+    ("id", pyarrow.int32()),
+    ("family", pyarrow.int16()),
+    ("uuid", pyarrow.string()),
+    ("relationship", pyarrow.dictionary(pyarrow.int32(), pyarrow.string())),
+    ("sex", pyarrow.dictionary(pyarrow.int8(), pyarrow.string())),
+    ("is_living", pyarrow.bool_()),
+    ("is_root", pyarrow.bool_()),
+    ("generation", pyarrow.int8()),
+    ("disease", pyarrow.dictionary(pyarrow.int32(), pyarrow.string())),
+    ("disease_code", pyarrow.int32()),
+    ("age_onset", pyarrow.int16()),
+    ("age_death", pyarrow.int16()),
+    ("twin_type", pyarrow.int8()),
+])
+
+EDGE_SCHEMA = pyarrow.schema([
+    ("family", pyarrow.int16()),
+    ("source", pyarrow.int32()),
+    ("target", pyarrow.int32()),
+    ("kind", pyarrow.dictionary(pyarrow.int8(), pyarrow.string())),
+    # The partnership index for mate edges
+    ("index", pyarrow.int16()),
+])
+
+
+def _interned_column(string_ids: List[Optional[int]]) -> pyarrow.DictionaryArray:
+    # Strings are already interned, so the dictionary is built straight from the ids without hashing any strings.
+    codes: Dict[int, int] = {}
+    indices = [None if string_id is None else codes.setdefault(string_id, len(codes)) for string_id in string_ids]
+
+    dictionary = [""] * len(codes)
+    for string_id, code in codes.items():
+        dictionary[code] = STRINGS.lookup(string_id)
+
+    return pyarrow.DictionaryArray.from_arrays(pyarrow.array(indices, pyarrow.int32()),
+                                               pyarrow.array(dictionary, pyarrow.string()))
+
+
+def _small_dictionary_column(values: List[Optional[str]], dictionary: List[str]) -> pyarrow.DictionaryArray:
+    codes = {value: code for code, value in enumerate(dictionary)}
+    return pyarrow.DictionaryArray.from_arrays(
+        pyarrow.array([None if value is None else codes[value] for value in values], pyarrow.int8()),
+        pyarrow.array(dictionary, pyarrow.string()))
+
+
+def build_tables(people: Iterable[Person]) -> Tuple[pyarrow.Table, pyarrow.Table]:
+    # Rows are ordered by family, so each family is a contiguous slice that can become its own row group.
+    people = sorted(people, key=lambda person: person.file_number)
+    ids = {person.uuid: i for i, person in enumerate(people)}
+
+    nodes = pyarrow.Table.from_arrays([
+        pyarrow.array(range(len(people)), pyarrow.int32()),
+        pyarrow.array([person.file_number for person in people], pyarrow.int16()),
+        pyarrow.array([person.uuid for person in people], pyarrow.string()),
+        _interned_column([person.relationship_id for person in people]),
+        _small_dictionary_column(["M" if person.sex == Gender.MALE else "F" for person in people], ["M", "F"]),
+        pyarrow.array([person.is_living for person in people], pyarrow.bool_()),
+        pyarrow.array([person.is_root for person in people], pyarrow.bool_()),
+        pyarrow.array([person.generation for person in people], pyarrow.int8()),
+        _interned_column([person.disease_id for person in people]),
+        pyarrow.array([int(person.disease) if person.disease is not None else None for person in people],
+                      pyarrow.int32()),
+        pyarrow.array([person.age_onset for person in people], pyarrow.int16()),
+        pyarrow.array([person.age_death for person in people], pyarrow.int16()),
+        pyarrow.array([int(person.twin_type) if person.twin_type is not None else None for person in people],
+                      pyarrow.int8()),
+    ], schema=NODE_SCHEMA)
+
+    edges: List[Tuple[int, int, int, str, Optional[int]]] = []
+    for person in people:
+        person_id = ids[person.uuid]
+
+        for parent in (person.father, person.mother):
+            if parent is not None and parent.uuid in ids:
+                edges.append((person.file_number, ids[parent.uuid], person_id, PARENT, None))
+
+        # Symmetric relationships are emitted once, from the person with the lower id
+        for partnership in person.partnerships:
+            other = partnership.other(person)
+            if other.uuid in ids and person_id < ids[other.uuid]:
+                edges.append((person.file_number, person_id, ids[other.uuid], MATE, partnership.index))
+
+        for sibling in person.siblings:
+            if sibling.uuid in ids and person_id < ids[sibling.uuid]:
+                edges.append((person.file_number, person_id, ids[sibling.uuid], SIBLING, None))
+
+        if person.twin is not None and person.twin.uuid in ids and person_id < ids[person.twin.uuid]:
+            edges.append((person.file_number, person_id, ids[person.twin.uuid], TWIN, None))
+
+    edges_table = pyarrow.Table.from_arrays([
+        pyarrow.array([edge[0] for edge in edges], pyarrow.int16()),
+        pyarrow.array([edge[1] for edge in edges], pyarrow.int32()),
+        pyarrow.array([edge[2] for edge in edges], pyarrow.int32()),
+        _small_dictionary_column([edge[3] for edge in edges], EDGE_KINDS),
+        pyarrow.array([edge[4] for edge in edges], pyarrow.int16()),
+    ], schema=EDGE_SCHEMA)
+
+    return nodes, edges_table
+
+
+def _family_slices(table: pyarrow.Table) -> Iterable[pyarrow.Table]:
+    families = table.column("family").to_pylist()
+
+    start = 0
+    for i in range(1, len(families) + 1):
+        if i == len(families) or families[i] != families[start]:
+            yield table.slice(start, i - start)
+            start = i
+
+
+def write_parquet(people: Iterable[Person], directory: str) -> Tuple[str, str]:
+    nodes, edges = build_tables(people)
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for name, table in (("nodes", nodes), ("edges", edges)):
+        path = os.path.join(directory, f"{name}.parquet")
+
+        # One row group per family, so readers filtering on family skip the others using row group statistics.
+        with pyarrow.parquet.ParquetWriter(path, table.schema) as writer:
+            for family in _family_slices(table):
+                writer.write_table(family)
+
+        paths.append(path)
+
+    return paths[0], paths[1]
+
+
+def write_arrow(people: Iterable[Person], directory: str) -> Tuple[str, str]:
+    nodes, edges = build_tables(people)
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for name, table in (("nodes", nodes), ("edges", edges)):
+        path = os.path.join(directory, f"{name}.arrow")
+
+        # One record batch per family, the Arrow IPC equivalent of a row group
+        with pyarrow.ipc.new_file(path, table.schema) as writer:
+            for family in _family_slices(table):
+                writer.write_table(family)
+
+        paths.append(path)
+
+    return paths[0], paths[1]
+
+
+if __name__ == "__main__":
+    roots, people = get_roots_and_people()
+
+    output_directory = sys.argv[1] if len(sys.argv) > 1 else "columnar"
+    nodes_path, edges_path = write_parquet(people.values(), output_directory)
+
+    print(f"Wrote {nodes_path} and {edges_path}")
@@ -0,0 +1,184 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from client import SOCKET_PATH
+from encoder import DATA_DIRECTORY, FILE_NAMES, Person, load_family
+from gen_dot import clear_dot_cache, generate_dot
+
+# Seconds between checks of the data directory for changed files
+POLL_INTERVAL = 1.0
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Cohort(object):
+    directory: str
+    families: Dict[int, Tuple[Optional[str], Dict[str, Person]]]
+    stamps: Dict[int, Optional[Tuple[int, int]]]
+    errors: Dict[int, str]
+
+    def __init__(self, directory: str = DATA_DIRECTORY):
+        self.directory = directory
+        self.families = {}
+        self.stamps = {}
+        self.errors = {}
+
+    def refresh(self) -> int:
+        # Only families whose file changed are reloaded. Each reload builds new families and errors dicts and swaps
+        # them in, so requests being answered meanwhile keep a consistent view without taking a lock.
+        reloaded = 0
+
+        for i, file_name in enumerate(FILE_NAMES):
+            file_number = i + 1
+            stamp = file_stamp(os.path.join(self.directory, file_name))
+
+            if file_number in self.stamps and self.stamps[file_number] == stamp:
+                continue
+
+            self.stamps[file_number] = stamp
+
+            try:
+                family = load_family(file_number, file_name, self.directory)
+            except Exception as e:
+                # Keep serving the last good version of the family until the file is fixed
+                errors = dict(self.errors)
+                errors[file_number] = f"{type(e).__name__}: {e}"
+                self.errors = errors
+                continue
+
+            families = dict(self.families)
+            families[file_number] = family
+            self.families = families
+            if file_number in self.errors:
+                self.errors = {n: error for n, error in self.errors.items() if n != file_number}
+            clear_dot_cache(file_number)
+            reloaded += 1
+
+        return reloaded
+
+    def watch(self, interval: float = POLL_INTERVAL):
+        while True:
+            time.sleep(interval)
+            self.refresh()
+
+    def roots(self) -> Dict[str, str]:
+        return {str(file_number): root_uuid for file_number, (root_uuid, _) in sorted(self.families.items())
+                if root_uuid is not None}
+
+    def people(self, family: Optional[int] = None) -> Dict[str, Person]:
+        families = self.families
+        if family is not None:
+            return families[family][1] if family in families else {}
+
+        people: Dict[str, Person] = {}
+        for file_number in sorted(families.keys()):
+            people.update(families[file_number][1])
+        return people
+
+
+def handle_command(cohort: Cohort, request: dict) -> dict:
+    command = request.get("command")
+
+    if command == "status":
+        return {
+            # The ids of the families that loaded, which need not be 1 to n when some files failed
+            "families": sorted(cohort.families.keys()),
+            "people": sum(len(people) for _, people in cohort.families.values()),
+            "errors": {str(file_number): error for file_number, error in cohort.errors.items()}
+        }
+    elif command == "export":
+        return {
+            "roots": cohort.roots(),
+            "nodes": {person.uuid: person.to_encodable_dict() for person in cohort.people().values()}
+        }
+    elif command == "dot":
+        family = int(request["family"])
+        if family not in cohort.families:
+            raise ValueError(f"No family {family}")
+
+        return {"dot": generate_dot(cohort.roots(), cohort.people(family), family)}
+    elif command == "query":
+        family = request.get("family")
+        relationship = request.get("relationship")
+        disease = request.get("disease")
+
+        people = cohort.people(int(family) if family is not None else None).values()
+        if relationship is not None:
+            people = [person for person in people if person.relationship_to_self.lower() == relationship.lower()]
+        if disease is not None:
+            people = [person for person in people
+                      if person.disease_original is not None and person.disease_original.lower() == disease.lower()]
+
+        return {"nodes": [person.to_encodable_dict() for person in people]}
+    else:
+        raise ValueError(f"Unknown command {command!r}")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    # One JSON request per line, answered with one JSON line
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = {"ok": True, "result": handle_command(self.server.cohort, json.loads(line))}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, cohort: Cohort):
+        self.cohort = cohort
+        super().__init__(socket_path, RequestHandler)
+
+
+def serve(socket_path: str = SOCKET_PATH, directory: str = DATA_DIRECTORY):
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            # Left behind by a daemon that didn't shut down cleanly, and would make bind fail
+            os.unlink(socket_path)
+        else:
+            raise RuntimeError(f"A daemon is already serving on {socket_path}")
+        finally:
+            probe.close()
+
+    cohort = Cohort(directory)
+    cohort.refresh()
+
+    watcher = threading.Thread(target=cohort.watch, daemon=True)
+    watcher.start()
+
+    # Exit through the finally below on a plain kill too, so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    with DaemonServer(socket_path, cohort) as server:
+        print(f"Serving {len(cohort.families)} families on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else SOCKET_PATH)
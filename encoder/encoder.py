@@ -1,15 +1,56 @@
 from __future__ import annotations
 
+import itertools
 import json
 import math
-from uuid import uuid4
+import os
+from uuid import UUID, uuid5
 from typing import Optional, List, Dict, Tuple
 
 import pandas
 from numpy.core.multiarray import ndarray
 
 from enums import *
-from parsers import StepSequence, parse_relationship_text, StepDirection
+from interning import STRINGS
+from parsers import Step, StepSequence, parse_relationship_text, StepDirection
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "All in the Family", "All in the Family")
+
+FILE_NAMES = [
+    "F1.txt",
+    "F2.txt",
+    "F3.txt",
+    "F4.txt",
+    "F5.txt",
+    "F6.txt",
+    "F7.txt",
+    "F8.txt",
+    "F9.txt",
+    "F10.txt",
+    "F11.txt",
+    "F12.txt",
+    "F13.txt",
+    "F14.txt",
+    "F15.txt",
+    "F16.txt",
+    "F17.txt",
+    "F18.txt",
+    "F19.txt",
+    "F20.txt"
+]
+
+
+# Person ids are derived from the family and the row, so every load of an unchanged file gives the same ids, in any
+# process. Clients that cache parts of a family rely on this to join them back up.
+PERSON_ID_NAMESPACE = UUID("8eaa5414-d64f-43ff-ac88-2a10bbe8ccfc")
+
+# Version of the format Person.to_encodable_dict writes. It is part of every family's ETag, so bumping it whenever
+# the format changes invalidates what clients have cached.
+ENCODING_VERSION = 3
+
+
+def person_uuid(file_number: int, row: int) -> str:
+    return str(uuid5(PERSON_ID_NAMESPACE, f"{file_number}:{row}"))
 
 
 def calculate_generation_from_path(path: StepSequence) -> int:
@@ -24,27 +65,67 @@ def calculate_generation_from_path(path: StepSequence) -> int:
     return generation
 
 
+# Parsed paths are shared between everyone with the same relationship text, keyed by its interned id.
+_paths_by_relationship: Dict[int, StepSequence] = {}
+
+
+def path_for_relationship(relationship_id: int) -> StepSequence:
+    path = _paths_by_relationship.get(relationship_id)
+    if path is None:
+        path = parse_relationship_text(STRINGS.lookup(relationship_id))
+        _paths_by_relationship[relationship_id] = path
+    return path
+
+
+# Versions are drawn from one process-wide counter, so a person built by a reload never has the same version as the
+# person it replaces, and anything stamped with the old version can't be mistaken for current.
+_versions = itertools.count()
+
+
+class Partnership(object):
+    __slots__ = ("index", "partners")
+
+    # The mate index from the relationship text ("Father Mate 2" is the father's partnership 2)
+    index: int
+    partners: Tuple[Person, Person]
+
+    def __init__(self, index: int, first: Person, second: Person):
+        self.index = index
+        self.partners = (first, second)
+
+    def other(self, person: Person) -> Person:
+        return self.partners[1] if self.partners[0] is person else self.partners[0]
+
+
 class Person(object):
+    # Cohorts hold many small Person objects, so skip the per-instance __dict__.
+    __slots__ = ("file_number", "uuid", "is_root", "relationship_id", "path", "sex", "is_living", "generation",
+                 "disease", "disease_id", "age_onset", "age_death", "mother", "father", "siblings", "children",
+                 "mate", "partnerships", "twin", "twin_type", "has_full_information", "version")
+
     file_number: int
     uuid: str
     is_root: bool
-    relationship_to_self: str
+    relationship_id: int
     path: StepSequence
     sex: Gender
     is_living: bool
-    label: str
     generation: int
     disease: Optional[Disease]
-    disease_original: Optional[str]
+    disease_id: Optional[int]
     age_onset: Optional[int]
     age_death: Optional[int]
     mother: Optional[Person]
     father: Optional[Person]
     siblings: List[Person]
     children: List[Person]
+    # The first partnership's partner. Every partnership, including later ones, is in partnerships.
     mate: Optional[Person]
+    partnerships: List[Partnership]
     twin: Optional[Person]
+    twin_type: Optional[TwinType]
     has_full_information: bool
+    version: int
 
     def __init__(self,
                  file_number: int,
@@ -60,30 +141,113 @@ class Person(object):
         self.file_number = file_number
         self.uuid = uuid
         self.relationship_to_self = relationship_to_self
-        self.path = parse_relationship_text(self.relationship_to_self)
-        self.generation = calculate_generation_from_path(self.path)
-        self.is_root = len(self.path.items) == 0
         self.sex = sex
         self.is_living = is_living
         self.disease = disease
         self.disease_original = disease_original
-        self.label = self.relationship_to_self + ("\\n" + self.disease_original if self.disease_original else "")
         self.age_onset = age_onset
         self.age_death = age_death
         self.father = None
         self.mother = None
         self.mate = None
+        self.partnerships = []
         self.children = []
         self.siblings = []
         self.twin = None
         self.has_full_information = False
+        self.version = next(_versions)
+
+    def update(self, **attributes):
+        # Anything derived from this person's fields (e.g. DOT fragments) is keyed on the version, so bump it on edit
+        for name, value in attributes.items():
+            setattr(self, name, value)
+
+        self.version = next(_versions)
+
+    @property
+    def relationship_to_self(self) -> str:
+        return STRINGS.lookup(self.relationship_id)
+
+    @relationship_to_self.setter
+    def relationship_to_self(self, relationship_to_self: str):
+        self.relationship_id = STRINGS.intern(relationship_to_self)
+        self.path = path_for_relationship(self.relationship_id)
+        self.generation = calculate_generation_from_path(self.path)
+        self.is_root = len(self.path.items) == 0
+        self.twin_type = self.path.twin
+
+    @property
+    def disease_original(self) -> Optional[str]:
+        return STRINGS.lookup(self.disease_id)
+
+    @disease_original.setter
+    def disease_original(self, disease_original: Optional[str]):
+        self.disease_id = STRINGS.intern(disease_original)
+
+    @property
+    def label(self) -> str:
+        return STRINGS.label(self.relationship_id, self.disease_id)
+
+    def partner(self, index: int = 1) -> Optional[Person]:
+        for partnership in self.partnerships:
+            if partnership.index == index:
+                return partnership.other(self)
+
+        return None
+
+    def partner_index(self, other: Person) -> Optional[int]:
+        for partnership in self.partnerships:
+            if other in partnership.partners:
+                return partnership.index
+
+        return None
+
+    def next_partner_index(self) -> int:
+        indexes = {partnership.index for partnership in self.partnerships}
+        index = 1
+        while index in indexes:
+            index += 1
+        return index
+
+    def add_partner(self, other: Person, index: int = 1) -> Partnership:
+        for partnership in self.partnerships:
+            if other in partnership.partners:
+                return partnership
+
+        partnership = Partnership(index, self, other)
+        self.partnerships.append(partnership)
+        self.partnerships.sort(key=lambda p: p.index)
+        other.partnerships.append(partnership)
+
+        # A later partnership doesn't replace the first mate, but it is the only one the new partner knows about
+        if index == 1 or self.mate is None:
+            self.mate = other
+        if index == 1 or other.mate is None:
+            other.mate = self
+
+        return partnership
+
+    def attach_twin(self):
+        # Twins are marked on both people, so whichever of the two is attached second pairs them up.
+        if self.twin_type is None or self.twin is not None:
+            return
+
+        candidates = list(self.siblings)
+        for parent in (self.father, self.mother):
+            if parent is not None:
+                candidates.extend(parent.children)
+
+        for candidate in candidates:
+            if candidate is not self and candidate.twin is None and candidate.twin_type == self.twin_type:
+                self.twin = candidate
+                candidate.twin = self
+                return
 
     def set_father(self, father: Person):
         self.father = father
 
         if self.mother:
-            self.mother.mate = father
-            self.father.mate = self.mother
+            self.mother.add_partner(father)
         if self not in father.children:
             father.children.append(self)
 
@@ -96,8 +260,7 @@ class Person(object):
         self.mother = mother
 
         if self.father:
-            self.father.mate = mother
-            self.mother.mate = self.father
+            self.father.add_partner(mother)
         if self not in mother.children:
             mother.children.append(self)
 
@@ -139,9 +302,13 @@ class Person(object):
                 self.mate.children.append(child)
                 child.father = self.mate
 
-    def set_mate(self, other: Person):
-        self.mate = other
-        other.mate = self
+    def set_mate(self, other: Person, index: int = 1):
+        self.add_partner(other, index)
+
+        # Children are only assumed to be shared with the first mate; a later mate's children are listed under them
+        if index != 1:
+            return
+
         for child in self.children:
             if child not in self.mate.children:
                 self.mate.children.append(child)
@@ -153,8 +320,7 @@ class Person(object):
         # Basically, we know this node has all the information, so we want it to share it with surrounding nodes
         self.father.children.append(self)
         self.mother.children.append(self)
-        self.father.mate = self.mother
-        self.mother.mate = self.father
+        self.father.add_partner(self.mother)
         for sibling in self.siblings:
             for otherSibling in self.siblings:
                 if sibling != otherSibling and otherSibling not in sibling.siblings:
@@ -198,6 +364,8 @@ class Person(object):
             "is_root": self.is_root,
             "mate": self.mate.uuid if self.mate else None,
             "mother": self.mother.uuid if self.mother else None,
+            "partnerships": [{"index": partnership.index, "mate": partnership.other(self).uuid}
+                             for partnership in self.partnerships],
             # "path": str(self.path),
             "relationship_to_self": self.relationship_to_self,
             "sex": "M" if self.sex == Gender.MALE else "F",
@@ -207,6 +375,67 @@ class Person(object):
         }
 
 
+def parents_mate(child: Person) -> Optional[Person]:
+    # The father's partner this child descends from: the mother if she is one of his partners, otherwise his mate
+    if child.mother is not None and child.father.partner_index(child.mother) is not None:
+        return child.mother
+    return child.father.mate
+
+
+DISEASE_NAMES: Dict[str, Disease] = {
+    "Heart Attack": Disease.HEART_ATTACK,
+    "Stroke": Disease.STROKE,
+    "Hypertension": Disease.HYPERTENSION,
+    "Alzheimer's Disease": Disease.ALZHEIMERS,
+    "Lung Cancer": Disease.LUNG_CANCER,
+    "Parkinson's Disease": Disease.PARKINSONS_DISEASE,
+    "Fire": Disease.FIRE,
+    "Melanoma": Disease.MELANOMA,
+    "Dementia": Disease.DEMENTIA,
+    "Uterine Cancer": Disease.UTERINE_CANCER,
+    "Cancer": Disease.CANCER,
+    "Type 1 Diabetes": Disease.DIABETES_TYPE_1,
+    "Suicide": Disease.SUICIDE,
+    "Type 2 Diabetes": Disease.DIABETES_TYPE_2,
+    "Killed in Action": Disease.KILLED_IN_ACTION,
+    "Plane Accident": Disease.PLANE_ACCIDENT,
+    "Stomach Cancer": Disease.STOMACH_CANCER,
+    "Achondroplasia": Disease.ACHONDROPLASIA,
+    "Hypercholesterolemia": Disease.HYPERCHOLESTEROLEMIA,
+    "SIDS": Disease.SIDS,
+    "Lupus": Disease.LUPUS,
+    "HTN": Disease.HYPERTENSION,
+    "Accident": Disease.ACCIDENT,
+    "Heart Disease": Disease.HEART_DISEASE,
+    "Leukemia": Disease.LEUKEMIA,
+    "Breast Cancer": Disease.BREAST_CANCER,
+    "Ovarian Cancer": Disease.OVARIAN_CANCER,
+    "Prostate Cancer": Disease.PROSTATE_CANCER,
+    "Cystic Fibrosis": Disease.CYSTIC_FIBROSIS,
+    "Emphysema": Disease.EMPHYSEMA,
+    "Grave's Disease": Disease.GRAVES_DISEASE,
+    "Rheumatoid Arthritis": Disease.RHEUMATOID_ARTHRITIS,
+    "Seizures": Disease.EPILEPSY,
+    "Fibromyalgia": Disease.FIBROMYALGIA,
+    "Gout": Disease.GOUT,
+    "Down Syndrome": Disease.DOWN_SYNDROME,
+    "High Cholesterol": Disease.HYPERCHOLESTEROLEMIA,
+    "Autism": Disease.AUTISM,
+    "Migranes": Disease.MIGRANES,
+    "Car Accident": Disease.CAR_ACCIDENT,
+    "Blood Infection": Disease.BLOOD_INFECTION,
+    "Cirrhosis of the Liver": Disease.CIRRHOSIS_LIVER,
+    "Asthma": Disease.ASTHMA,
+    "Infection": Disease.INFECTION,
+    "Crohn's Disease": Disease.CROHNS_DISEASE,
+    "Psoriasis": Disease.PSORIASIS,
+    "Liver Cancer": Disease.LIVER_CANCER,
+    "Epilepsy": Disease.EPILEPSY,
+    "Tay Sachs Disease": Disease.TAY_SACHS_DISEASE,
+    "Female Cancer": Disease.FEMALE_CANCER
+}
+
+
 def ndarray_to_person(file_number: int, id_number: str, val: ndarray) -> Person:
     relation_original = val[0]  # self, mother, etc.
     sex_original = val[1]  # M, F
@@ -243,106 +472,8 @@ def ndarray_to_person(file_number: int, id_number: str, val: ndarray) -> Person:
 
     if type(disease_original) == float and math.isnan(disease_original):
         disease = None
-    elif disease_original == "Heart Attack":
-        disease = Disease.HEART_ATTACK
-    elif disease_original == "Stroke":
-        disease = Disease.STROKE
-    elif disease_original == "Hypertension":
-        disease = Disease.HYPERTENSION
-    elif disease_original == "Alzheimer's Disease":
-        disease = Disease.ALZHEIMERS
-    elif disease_original == "Lung Cancer":
-        disease = Disease.LUNG_CANCER
-    elif disease_original == "Parkinson's Disease":
-        disease = Disease.PARKINSONS_DISEASE
-    elif disease_original == "Fire":
-        disease = Disease.FIRE
-    elif disease_original == "Melanoma":
-        disease = Disease.MELANOMA
-    elif disease_original == "Dementia":
-        disease = Disease.DEMENTIA
-    elif disease_original == "Uterine Cancer":
-        disease = Disease.UTERINE_CANCER
-    elif disease_original == "Cancer":
-        disease = Disease.CANCER
-    elif disease_original == "Type 1 Diabetes":
-        disease = Disease.DIABETES_TYPE_1
-    elif disease_original == "Suicide":
-        disease = Disease.SUICIDE
-    elif disease_original == "Type 2 Diabetes":
-        disease = Disease.DIABETES_TYPE_2
-    elif disease_original == "Killed in Action":
-        disease = Disease.KILLED_IN_ACTION
-    elif disease_original == "Plane Accident":
-        disease = Disease.PLANE_ACCIDENT
-    elif disease_original == "Stomach Cancer":
-        disease = Disease.STOMACH_CANCER
-    elif disease_original == "Achondroplasia":
-        disease = Disease.ACHONDROPLASIA
-    elif disease_original == "Hypercholesterolemia":
-        disease = Disease.HYPERCHOLESTEROLEMIA
-    elif disease_original == "SIDS":
-        disease = Disease.SIDS
-    elif disease_original == "Lupus":
-        disease = Disease.LUPUS
-    elif disease_original == "HTN":
-        disease = Disease.HYPERTENSION
-    elif disease_original == "Accident":
-        disease = Disease.ACCIDENT
-    elif disease_original == "Heart Disease":
-        disease = Disease.HEART_DISEASE
-    elif disease_original == "Leukemia":
-        disease = Disease.LEUKEMIA
-    elif disease_original == "Breast Cancer":
-        disease = Disease.BREAST_CANCER
-    elif disease_original == "Ovarian Cancer":
-        disease = Disease.OVARIAN_CANCER
-    elif disease_original == "Prostate Cancer":
-        disease = Disease.PROSTATE_CANCER
-    elif disease_original == "Cystic Fibrosis":
-        disease = Disease.CYSTIC_FIBROSIS
-    elif disease_original == "Emphysema":
-        disease = Disease.EMPHYSEMA
-    elif disease_original == "Grave's Disease":
-        disease = Disease.GRAVES_DISEASE
-    elif disease_original == "Rheumatoid Arthritis":
-        disease = Disease.RHEUMATOID_ARTHRITIS
-    elif disease_original == "Seizures":
-        disease = Disease.EPILEPSY
-    elif disease_original == "Fibromyalgia":
-        disease = Disease.FIBROMYALGIA
-    elif disease_original == "Gout":
-        disease = Disease.GOUT
-    elif disease_original == "Down Syndrome":
-        disease = Disease.DOWN_SYNDROME
-    elif disease_original == "High Cholesterol":
-        disease = Disease.HYPERCHOLESTEROLEMIA
-    elif disease_original == "Autism":
-        disease = Disease.AUTISM
-    elif disease_original == "Migranes":
-        disease = Disease.MIGRANES
-    elif disease_original == "Car Accident":
-        disease = Disease.CAR_ACCIDENT
-    elif disease_original == "Blood Infection":
-        disease = Disease.BLOOD_INFECTION
-    elif disease_original == "Cirrhosis of the Liver":
-        disease = Disease.CIRRHOSIS_LIVER
-    elif disease_original == "Asthma":
-        disease = Disease.ASTHMA
-    elif disease_original == "Infection":
-        disease = Disease.INFECTION
-    elif disease_original == "Crohn's Disease":
-        disease = Disease.CROHNS_DISEASE
-    elif disease_original == "Psoriasis":
-        disease = Disease.PSORIASIS
-    elif disease_original == "Liver Cancer":
-        disease = Disease.LIVER_CANCER
-    elif disease_original == "Epilepsy":
-        disease = Disease.EPILEPSY
-    elif disease_original == "Tay Sachs Disease":
-        disease = Disease.TAY_SACHS_DISEASE
-    elif disease_original == "Female Cancer":
-        disease = Disease.FEMALE_CANCER
+    elif disease_original in DISEASE_NAMES:
+        disease = DISEASE_NAMES[disease_original]
     else:
         raise ValueError(disease_original)
 
@@ -359,112 +490,114 @@ def ndarray_to_person(file_number: int, id_number: str, val: ndarray) -> Person:
     )
 
 
-def get_roots_and_people() -> Tuple[Dict[str, str], Dict[str, Person]]:
+def listed_mate(person: Person, path: List[Step]) -> Optional[Person]:
+    # An unindexed Mate step names the partner whose row was listed as that unindexed Mate. That row may have been
+    # given a later partnership index if the first was already taken, e.g. "Father Mate" in a file that also has Mother.
+    for partnership in person.partnerships:
+        other = partnership.other(person)
+        if other.path.items == path:
+            return other
+
+    return person.partner(1)
+
+
+def listed_relative(relatives: List[Person], path: List[Step]) -> Optional[Person]:
+    # An indexed Sibling or Child step names the relative listed with that index, which needn't be their position in
+    # the list, e.g. when "Child 2" is listed before "Child 1". Relatives reached some other way (like Self, among
+    # Mother's children) aren't listed under that path, so fall back to the position.
+    for relative in relatives:
+        if relative.path.items == path:
+            return relative
+
+    index = path[-1].index
+    return relatives[index - 1] if index <= len(relatives) else None
+
+
+def attach_person(root: Person, person: Person) -> bool:
+    # Walk the person's path from the root, then attach them as the relative named by the last step.
+    current_node: Person = root
+
+    for i, step in enumerate(person.path.items[:-1]):
+        if step.direction == StepDirection.FATHER:
+            current_node = current_node.father
+        elif step.direction == StepDirection.MOTHER:
+            current_node = current_node.mother
+        elif step.direction == StepDirection.MATE and step.index is None:
+            current_node = listed_mate(current_node, person.path.items[:i + 1])
+        elif step.direction == StepDirection.MATE:
+            current_node = current_node.partner(step.index)
+        elif step.direction == StepDirection.SIBLING:
+            current_node = listed_relative(current_node.siblings, person.path.items[:i + 1])
+        elif step.direction == StepDirection.CHILD:
+            current_node = listed_relative(current_node.children, person.path.items[:i + 1])
+
+        if current_node is None:
+            return False
+
+    step = person.path.items[-1]
+
+    if step.direction == StepDirection.FATHER and current_node.father is None:
+        current_node.set_father(person)
+    elif step.direction == StepDirection.MOTHER and current_node.mother is None:
+        current_node.set_mother(person)
+    elif step.direction == StepDirection.SIBLING:
+        current_node.add_sibling(person)
+    elif step.direction == StepDirection.CHILD:
+        current_node.add_child(person)
+    elif step.direction == StepDirection.MATE and step.index is None:
+        # An unindexed mate takes the first free partnership, rather than clashing with a parent already there
+        current_node.set_mate(person, current_node.next_partner_index())
+    elif step.direction == StepDirection.MATE and current_node.partner(step.index) is None:
+        current_node.set_mate(person, step.index)
+    else:
+        return False
+
+    person.attach_twin()
+    return True
+
+
+def load_family(file_number: int, file_name: str, directory: str = DATA_DIRECTORY) -> Tuple[Optional[str], Dict[str, Person]]:
     people: Dict[str, Person] = {}
+    root: Optional[Person] = None
+
+    df = pandas.read_csv(os.path.join(directory, file_name), sep="\t")
+
+    for j, value in enumerate(df.values):
+        uuid = person_uuid(file_number, j)
+        person = ndarray_to_person(file_number, uuid, value)
 
-    file_names = [
-        "F1.txt",
-        "F2.txt",
-        "F3.txt",
-        "F4.txt",
-        "F5.txt",
-        "F6.txt",
-        "F7.txt",
-        "F8.txt",
-        "F9.txt",
-        "F10.txt",
-        "F11.txt",
-        "F12.txt",
-        "F13.txt",
-        "F14.txt",
-        "F15.txt",
-        "F16.txt",
-        "F17.txt",
-        "F18.txt",
-        "F19.txt",
-        "F20.txt"
-    ]
+        if person.is_root and root is None:
+            root = person
 
+        people[uuid] = person
+
+    if root is None:
+        raise ValueError(f"Family {file_number} has no Self row.")
+
+    # Everyone's path only goes through relatives with shorter paths, so attaching in order of path length (and file
+    # order within a length) means each person can be attached in a single pass, with no retries.
+    for person in sorted(people.values(), key=lambda person: len(person.path.items)):
+        if person.is_root:
+            continue
+
+        if not attach_person(root, person):
+            raise Exception(f"Unable to attach {person.relationship_to_self} to family {file_number}.")
+
+    return root.uuid, people
+
+
+def get_roots_and_people() -> Tuple[Dict[str, str], Dict[str, Person]]:
+    people: Dict[str, Person] = {}
     roots: Dict[str, str] = {}
 
     # Load in our data
-    for i, file_name in enumerate(file_names):
-        df = pandas.read_csv('../All in the Family/All in the Family/' + file_name, sep="\t")
-
-        people_needing_processed = []
-
-        for j, value in enumerate(df.values):
-            uuid = str(uuid4())
-            person = ndarray_to_person(i + 1, uuid, value)
-
-            if person.is_root:
-                roots[str(i + 1)] = person.uuid
-
-            people[uuid] = person
-            people_needing_processed.append(people[uuid])
-
-        root: Optional[Person] = None
-
-        while len(people_needing_processed):
-            did_pop_person = False
-
-            for k, person in enumerate(people_needing_processed):
-                if person.is_root:
-                    root = person
-                    people_needing_processed.pop(k)
-                    did_pop_person = True
-                    break
-
-                if root is None:
-                    continue
-
-                current_node: Person = root
-                did_connect_node = False
-                for j, step in enumerate(person.path.items):
-                    is_last_step = j == len(person.path.items) - 1
-
-                    if is_last_step:
-                        # If the attribute in the direction of our path is None and we are on the last step,
-                        # then we have reached the edge of our tree and should add the leaf.
-                        if step.direction == StepDirection.FATHER and current_node.father is None and is_last_step:
-                            current_node.set_father(person)
-                            did_connect_node = True
-                        elif step.direction == StepDirection.MOTHER and current_node.mother is None and is_last_step:
-                            current_node.set_mother(person)
-                            did_connect_node = True
-                        elif step.direction == StepDirection.SIBLING and person not in current_node.siblings and is_last_step:
-                            current_node.add_sibling(person)
-                            did_connect_node = True
-                        elif step.direction == StepDirection.CHILD and person not in current_node.children and is_last_step:
-                            current_node.add_child(person)
-                            did_connect_node = True
-                        elif step.direction == StepDirection.MATE and person.mate is None and is_last_step:
-                            current_node.set_mate(person)
-                            did_connect_node = True
-                    else:
-                        # Otherwise, we should traverse to the next step in our path
-                        if step.direction == StepDirection.FATHER and current_node.father is not None:
-                            current_node = current_node.father
-                        elif step.direction == StepDirection.MOTHER and current_node.mother is not None:
-                            current_node = current_node.mother
-                        elif step.direction == StepDirection.MATE and current_node.mate is not None:
-                            current_node = current_node.mate
-                        elif step.direction == StepDirection.SIBLING and current_node.siblings[
-                            step.index - 1] is not None:
-                            current_node = current_node.siblings[step.index - 1]
-                        elif step.direction == StepDirection.CHILD and current_node.children[
-                            step.index - 1] is not None:
-                            current_node = current_node.children[step.index - 1]
-
-                if not did_connect_node:
-                    continue
-                else:
-                    people_needing_processed.pop(k)
-                    did_pop_person = True
-                    break
-
-            if not did_pop_person:
-                raise Exception("Unable to processes any more people.")
+    for i, file_name in enumerate(FILE_NAMES):
+        root_uuid, family = load_family(i + 1, file_name)
+
+        if root_uuid is not None:
+            roots[str(i + 1)] = root_uuid
+
+        people.update(family)
 
     return roots, people
 
@@ -79,3 +79,8 @@ class Disease(IntEnum):
 
     # Skin diseases
     PSORIASIS = 13100
+
+
+class TwinType(IntEnum):
+    FRATERNAL = 1
+    IDENTICAL = 2
@@ -0,0 +1,28 @@
+import os
+from tempfile import TemporaryDirectory
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from encoder import Person, load_family
+
+
+# The header row as the data files spell it, trailing space included
+HEADER = "Relationship\tSex\tStill Living\tDisease \tAge of Onset\tDeath\n"
+COLUMN_COUNT = 6
+
+
+def write_family(directory: str, file_name: str, rows: Iterable[Sequence[str]]):
+    # Rows can leave off trailing blank columns, e.g. ("Mother", "F", "Y").
+    with open(os.path.join(directory, file_name), "w") as f:
+        f.write(HEADER)
+        for row in rows:
+            f.write("\t".join(tuple(row) + ("",) * (COLUMN_COUNT - len(row))) + "\n")
+
+
+def load_rows(rows: Iterable[Sequence[str]], file_number: int = 1) -> Tuple[Optional[str], Dict[str, Person]]:
+    with TemporaryDirectory() as directory:
+        write_family(directory, f"F{file_number}.txt", rows)
+        return load_family(file_number, f"F{file_number}.txt", directory)
+
+
+def by_relationship(people: Dict[str, Person]) -> Dict[str, Person]:
+    return {person.relationship_to_self: person for person in people.values()}
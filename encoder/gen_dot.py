@@ -1,59 +1,158 @@
-
 import json
-from typing import Dict, List
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 
-from encoder import get_roots_and_people, Person
+from encoder import get_roots_and_people, parents_mate, Person
 from enums import Gender
 
 
+class DotStyle(object):
+    fontname: str
+    width: int
+    male_color: str
+    female_color: str
+
+    def __init__(self,
+                 fontname: str = "helvetica:bold",
+                 width: int = 2,
+                 male_color: str = "cornflowerblue",
+                 female_color: str = "pink"
+                 ):
+        self.fontname = fontname
+        self.width = width
+        self.male_color = male_color
+        self.female_color = female_color
+
+    def key(self) -> Tuple:
+        return self.fontname, self.width, self.male_color, self.female_color
+
+
+DEFAULT_STYLE = DotStyle()
+
+# Generated DOT fragments for each family, keyed by (fragment kind, owner uuid). Each entry holds the stamp it was
+# built from (the versions of every person it reads, plus the style for shapes) and is only rebuilt when that stamp
+# changes.
+_fragment_cache: Dict[int, Dict[Tuple[str, str], Tuple[Tuple, str]]] = {}
+
+# Junction point ids, keyed by the interned relationship ids of the couple, so they are built once per couple.
+_point_ids: Dict[Tuple[int, int], str] = {}
+
+
+def clear_dot_cache(file_number: Optional[int] = None):
+    # A reloaded family's people have new versions, so its old fragments are never reused; this only frees them.
+    if file_number is not None:
+        _fragment_cache.pop(file_number, None)
+        return
+
+    _fragment_cache.clear()
+    _point_ids.clear()
+
+
+def _memoized_fragment(file_number: int, kind: str, owner_uuid: str, stamp: Tuple, build: Callable[[], str]) -> str:
+    fragments = _fragment_cache.setdefault(file_number, {})
+
+    cached = fragments.get((kind, owner_uuid))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    text = build()
+    fragments[(kind, owner_uuid)] = (stamp, text)
+    return text
+
+
+@lru_cache(maxsize=None)
 def safe_uuid(uuid: str) -> str:
     return uuid.replace('-', '').replace(' ', '').lower()
 
 
+def couple_point_id(male: Person, mate: Optional[Person] = None) -> str:
+    mate = mate or male.mate
+    key = (male.relationship_id, mate.relationship_id)
+    point_id = _point_ids.get(key)
+
+    if point_id is None:
+        point_id = f"{safe_uuid(male.relationship_to_self)}+{safe_uuid(mate.relationship_to_self)}"
+        _point_ids[key] = point_id
+
+    return point_id
+
+
 def declare_male_node(id):
     return '{0} [shape=box, regular=1, color="blue"];'.format(id)
 
 
-def generate_shape_text_from_person(person: Person) -> str:
+def generate_shape_text_from_person(person: Person, style: DotStyle = DEFAULT_STYLE) -> str:
     # return f""""{person.relationship_to_self}" [shape={"oval" if person.sex == Gender.FEMALE else "box"}, style=filled, regular=1, color="{"pink" if person.sex == Gender.FEMALE else "cornflowerblue"}"];"""
-    j = "\\n"
-    return f""""{person.label}" [fontname="helvetica:bold", width=2, shape={"oval" if person.sex == Gender.FEMALE else "box"}, style=filled, regular=1, color="{"pink" if person.sex == Gender.FEMALE else "cornflowerblue"}"];"""
+    return f""""{person.label}" [fontname="{style.fontname}", width={style.width}, shape={"oval" if person.sex == Gender.FEMALE else "box"}, style=filled, regular=1, color="{style.female_color if person.sex == Gender.FEMALE else style.male_color}"];"""
 
 
-def generate_points_text_from_male(person: Person) -> str:
-    return f""""{safe_uuid(person.relationship_to_self)}+{safe_uuid(person.mate.relationship_to_self)}" [shape=point];"""
+def generate_points_text_from_male(person: Person, mate: Optional[Person] = None) -> str:
+    return f""""{couple_point_id(person, mate)}" [shape=point];"""
 
 
-def generate_horizontal_lines_text_from_male(person: Person) -> str:
-    return f""""{person.label}" -- "{safe_uuid(person.relationship_to_self)}+{safe_uuid(person.mate.relationship_to_self)}" -- "{person.mate.label}";"""
+def generate_horizontal_lines_text_from_male(person: Person, mate: Optional[Person] = None) -> str:
+    mate = mate or person.mate
+    return f""""{person.label}" -- "{couple_point_id(person, mate)}" -- "{mate.label}";"""
 
 
-def generate_line_from_parent_to_child(father: Person, child: Person) -> str:
-    return f""""{safe_uuid(father.relationship_to_self)}+{safe_uuid(father.mate.relationship_to_self)}" -- "{child.label}";"""
+def generate_line_from_parent_to_child(father: Person, child: Person, mate: Optional[Person] = None) -> str:
+    return f""""{couple_point_id(father, mate)}" -- "{child.label}";"""
 
 
 def generate_lines_from_parents_to_children(father: Person) -> str:
     return "\n".join([generate_line_from_parent_to_child(father, child) for child in father.children])
 
 
-def write_dot(roots, people, tree_number: int, output_path: str):
+def cached_shape_text(person: Person, style: DotStyle = DEFAULT_STYLE) -> str:
+    return _memoized_fragment(person.file_number, "shape", person.uuid, (person.version, style.key()),
+                              lambda: generate_shape_text_from_person(person, style))
+
+
+def cached_points_text(male: Person, mate: Person) -> str:
+    return _memoized_fragment(male.file_number, "point", f"{male.uuid}+{mate.uuid}", (male.version, mate.version),
+                              lambda: generate_points_text_from_male(male, mate))
+
+
+def cached_horizontal_lines_text(male: Person, mate: Person) -> str:
+    return _memoized_fragment(male.file_number, "partner", f"{male.uuid}+{mate.uuid}", (male.version, mate.version),
+                              lambda: generate_horizontal_lines_text_from_male(male, mate))
+
+
+def cached_line_from_parent_to_child(father: Person, child: Person, mate: Person) -> str:
+    stamp = (child.version, father.uuid, father.version, mate.uuid, mate.version)
+    return _memoized_fragment(child.file_number, "child", child.uuid, stamp,
+                              lambda: generate_line_from_parent_to_child(father, child, mate))
+
+
+def generate_rank_text(people_in_generation: List[Person]) -> str:
+    j = " ".join([f'"{person.label}"' for person in people_in_generation])
+    return f"{{rank=same; {j}}}"
+
+
+def cached_rank_text(tree_number: int, generation: int, people_in_generation: List[Person]) -> str:
+    stamp = tuple((person.uuid, person.version) for person in people_in_generation)
+    return _memoized_fragment(tree_number, "rank", str(generation), stamp,
+                              lambda: generate_rank_text(people_in_generation))
+
+
+def generate_dot(roots, people, tree_number: int, style: DotStyle = DEFAULT_STYLE) -> str:
     # Generate shapes
     people_in_tree = list(filter(lambda person: person.file_number == tree_number, people.values()))
 
-    shapes_output = "\n".join([generate_shape_text_from_person(person) for person in people_in_tree])
+    shapes_output = "\n".join([cached_shape_text(person, style) for person in people_in_tree])
 
-    # Generate points
-    males_in_tree_with_mate = list(filter(lambda person: person.sex == Gender.MALE and person.mate is not None,
-                                     people_in_tree))
-    points_output = "\n".join([generate_points_text_from_male(male) for male in males_in_tree_with_mate])
+    # Generate points, one per partnership
+    couples_in_tree = [(person, partnership.other(person)) for person in people_in_tree if person.sex == Gender.MALE
+                       for partnership in person.partnerships]
+    points_output = "\n".join([cached_points_text(male, mate) for male, mate in couples_in_tree])
 
     # Generate lines from parents to children
     children_with_parents = list(filter(lambda person: person.father is not None or person.mother is not None, people_in_tree))
-    parent_to_child_lines_output = "\n".join([generate_line_from_parent_to_child(child.father, child)
+    parent_to_child_lines_output = "\n".join([cached_line_from_parent_to_child(child.father, child, parents_mate(child))
                                               for child in children_with_parents if child.father and child.father.mate])
 
     # Generate lines between partners
-    partner_line_output = "\n".join([generate_horizontal_lines_text_from_male(male) for male in males_in_tree_with_mate])
+    partner_line_output = "\n".join([cached_horizontal_lines_text(male, mate) for male, mate in couples_in_tree])
 
     # Generate ranks
     minimum_generation = min(map(lambda person: person.generation, people_in_tree))
@@ -67,9 +166,7 @@ def write_dot(roots, people, tree_number: int, output_path: str):
     ranks_text = []
     for generation in range(maximum_generation, minimum_generation - 1, -1):
         people_in_generation = people_by_generation[str(generation)]
-        j = " ".join([f'"{person.label}"' for person in people_in_generation])
-        rank_text = f"{{rank=same; {j}}}"
-        ranks_text.append(rank_text)
+        ranks_text.append(cached_rank_text(tree_number, generation, people_in_generation))
 
     ranking_output = "\n".join(ranks_text)
 
@@ -89,6 +186,12 @@ ordering=out;
 }}
     """
 
+    return output
+
+
+def write_dot(roots, people, tree_number: int, output_path: str, style: DotStyle = DEFAULT_STYLE):
+    output = generate_dot(roots, people, tree_number, style)
+
     with open(output_path, 'w') as f:
         f.write(output)
 
@@ -0,0 +1,58 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class StringTable(object):
+    strings: List[str]
+    ids: Dict[str, int]
+    labels: Dict[Tuple[int, Optional[int]], str]
+    lock: threading.Lock
+
+    def __init__(self):
+        self.strings = []
+        self.ids = {}
+        self.labels = {}
+        # Families can be loaded on several threads at once (e.g. by the async app), and two of them interning the same
+        # new string must not give it two ids.
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+
+        string_id = self.ids.get(value)
+        if string_id is not None:
+            return string_id
+
+        with self.lock:
+            string_id = self.ids.get(value)
+            if string_id is None:
+                string_id = len(self.strings)
+                self.strings.append(value)
+                self.ids[value] = string_id
+
+        return string_id
+
+    def lookup(self, string_id: Optional[int]) -> Optional[str]:
+        if string_id is None:
+            return None
+        return self.strings[string_id]
+
+    def label(self, relationship_id: int, disease_id: Optional[int]) -> str:
+        # Labels are only built the first time a (relationship, disease) pair is asked for, then shared.
+        key = (relationship_id, disease_id)
+        label = self.labels.get(key)
+
+        if label is None:
+            disease = self.lookup(disease_id)
+            label = self.strings[relationship_id] + ("\\n" + disease if disease else "")
+            self.labels[key] = label
+
+        return label
+
+
+# Shared by every Person in the process, so each distinct relationship or disease spelling is stored once.
+STRINGS = StringTable()
@@ -0,0 +1,347 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from encoder import parents_mate, Person
+from enums import Gender
+
+
+# Horizontal distance between the centers of neighbouring people in a unit, and extra space between units.
+PERSON_SPACING = 1.0
+UNIT_SPACING = 0.5
+
+# Vertical distance between generations.
+GENERATION_SPACING = 1.0
+
+Unit = Tuple[Person, ...]
+
+# Junctions are keyed by the uuids of the couple they join, male first, or by a lone parent's uuid when the child's
+# other parent isn't in the family.
+JunctionKey = Tuple[str, ...]
+
+
+def _couple_key(a: Person, b: Person) -> JunctionKey:
+    return (b.uuid, a.uuid) if b.sex == Gender.MALE and a.sex != Gender.MALE else (a.uuid, b.uuid)
+
+
+def _arrange_unit(members: List[Person]) -> Unit:
+    # The member with the most partners goes in the middle, with their partners alternating right and left in
+    # partnership order, so every couple in the unit sits side by side. A lone couple comes out male first.
+    hub = max(members, key=lambda member: (len(member.partnerships), member.sex == Gender.MALE))
+
+    partners = [partnership.other(hub) for partnership in hub.partnerships if partnership.other(hub) in members]
+    others = [member for member in members if member is not hub and member not in partners]
+
+    return tuple(reversed(partners[1::2])) + (hub,) + tuple(partners[0::2]) + tuple(others)
+
+
+def _build_rows(people: List[Person]) -> List[List[Unit]]:
+    # Rows run from the oldest generation down. Everyone joined by partnerships within a generation is kept together
+    # as one unit, so that reordering a row never separates a couple from the junction point between them.
+    uuids = {person.uuid for person in people}
+    generations = sorted({person.generation for person in people}, reverse=True)
+
+    rows: List[List[Unit]] = []
+    for generation in generations:
+        row: List[Unit] = []
+        placed = set()
+
+        for person in people:
+            if person.generation != generation or person.uuid in placed:
+                continue
+
+            members = [person]
+            placed.add(person.uuid)
+            for member in members:
+                for partnership in member.partnerships:
+                    other = partnership.other(member)
+                    if other.uuid in uuids and other.generation == generation and other.uuid not in placed:
+                        members.append(other)
+                        placed.add(other.uuid)
+
+            row.append(_arrange_unit(members))
+
+        rows.append(row)
+
+    return rows
+
+
+def _build_junctions(rows: List[List[Unit]]) -> Tuple[Dict[JunctionKey, int], Dict[str, JunctionKey]]:
+    # Returns the row of every junction, and the junction each child hangs from. Every couple gets a junction, and
+    # each child hangs from the one for their father and parents_mate, the same couple gen_dot draws them from.
+    junction_rows: Dict[JunctionKey, int] = {}
+    row_of: Dict[str, int] = {}
+
+    for r, row in enumerate(rows):
+        for unit in row:
+            for member in unit:
+                row_of[member.uuid] = r
+                for partnership in member.partnerships:
+                    if partnership.other(member) in unit:
+                        junction_rows[_couple_key(member, partnership.other(member))] = r
+
+    parent_junction: Dict[str, JunctionKey] = {}
+    for row in rows:
+        for unit in row:
+            for person in unit:
+                key = None
+
+                if person.father is not None and parents_mate(person) is not None:
+                    key = _couple_key(person.father, parents_mate(person))
+
+                if key not in junction_rows:
+                    parents = [parent for parent in (person.father, person.mother)
+                               if parent is not None and parent.uuid in row_of]
+                    key = (parents[0].uuid,) if parents else None
+                    if key is not None:
+                        junction_rows[key] = row_of[key[0]]
+
+                if key is not None:
+                    parent_junction[person.uuid] = key
+
+    return junction_rows, parent_junction
+
+
+def _unit_positions(row: List[Unit]) -> Dict[str, float]:
+    positions: Dict[str, float] = {}
+    cursor = 0.0
+
+    for unit in row:
+        for i, member in enumerate(unit):
+            positions[member.uuid] = cursor + i * PERSON_SPACING
+        cursor += len(unit) * PERSON_SPACING + UNIT_SPACING
+
+    return positions
+
+
+def _junction_x(key: JunctionKey, positions: Dict[str, float]) -> float:
+    return sum(positions[uuid] for uuid in key) / len(key)
+
+
+def _count_crossings(rows: List[List[Unit]], junction_rows: Dict[JunctionKey, int],
+                     parent_junction: Dict[str, JunctionKey]) -> int:
+    crossings = 0
+
+    for r in range(1, len(rows)):
+        positions = _unit_positions(rows[r - 1])
+        positions.update(_unit_positions(rows[r]))
+
+        edges = [(_junction_x(parent_junction[member.uuid], positions), positions[member.uuid])
+                 for unit in rows[r] for member in unit
+                 if member.uuid in parent_junction and junction_rows[parent_junction[member.uuid]] == r - 1]
+
+        for i, (a1, b1) in enumerate(edges):
+            for a2, b2 in edges[i + 1:]:
+                if (a1 - a2) * (b1 - b2) < 0:
+                    crossings += 1
+
+    return crossings
+
+
+def _reorder_row(row: List[Unit], connected_xs: Callable[[Unit], List[float]]) -> List[Unit]:
+    # Barycenter heuristic: sort units by the mean position of what they connect to in the neighbouring row.
+    # Units with no connections keep their current position as their key, and the sort is stable.
+    positions = _unit_positions(row)
+    keys = []
+
+    for unit in row:
+        connected = connected_xs(unit)
+        keys.append(sum(connected) / len(connected) if connected else positions[unit[0].uuid])
+
+    order = sorted(range(len(row)), key=lambda i: keys[i])
+    return [row[i] for i in order]
+
+
+def _closest_increasing(targets: List[Optional[float]], weights: List[int]) -> List[float]:
+    # Pool adjacent violators: the non-decreasing sequence closest to the targets in weighted least squares.
+    # Entries without a target take the value of the nearest one to their left (or right, at the start).
+    blocks: List[List[float]] = []  # [weight, weighted sum, number of targets pooled]
+    for target, weight in zip(targets, weights):
+        if target is None:
+            continue
+
+        blocks.append([weight, weight * target, 1])
+        while len(blocks) > 1 and blocks[-2][1] / blocks[-2][0] > blocks[-1][1] / blocks[-1][0]:
+            weight, total, count = blocks.pop()
+            blocks[-1][0] += weight
+            blocks[-1][1] += total
+            blocks[-1][2] += count
+
+    values = [block[1] / block[0] for block in blocks for _ in range(int(block[2]))]
+
+    result: List[float] = []
+    for target in targets:
+        if target is not None:
+            result.append(values.pop(0))
+        else:
+            result.append(result[-1] if result else None)
+
+    first = next((value for value in result if value is not None), 0.0)
+    return [first if value is None else value for value in result]
+
+
+def _spread_row(row: List[Unit], ideal_lefts: Callable[[Dict[str, float]], List[float]]) -> Dict[str, float]:
+    # Placing unit i at left edge starts[i] + shift[i] keeps the minimum spacing exactly when the shifts don't
+    # decrease, so the best placement is the closest non-decreasing sequence of shifts to each unit's ideal one.
+    # Siblings that all want the same spot are pooled, which centers them as a group under their parents.
+    offsets: List[Dict[str, float]] = []
+    starts: List[float] = []
+    targets: List[Optional[float]] = []
+    weights: List[int] = []
+    cursor = 0.0
+
+    for unit in row:
+        unit_offsets = {member.uuid: i * PERSON_SPACING for i, member in enumerate(unit)}
+        ideal = ideal_lefts(unit_offsets)
+
+        offsets.append(unit_offsets)
+        starts.append(cursor)
+        targets.append(sum(ideal) / len(ideal) - cursor if ideal else None)
+        weights.append(len(ideal))
+        cursor += len(unit) * PERSON_SPACING + UNIT_SPACING
+
+    positions: Dict[str, float] = {}
+    for unit_offsets, start, shift in zip(offsets, starts, _closest_increasing(targets, weights)):
+        for uuid, offset in unit_offsets.items():
+            positions[uuid] = start + shift + offset
+
+    return positions
+
+
+def _place_rows(rows: List[List[Unit]], parent_junction: Dict[str, JunctionKey],
+                children_of: Dict[JunctionKey, List[str]], passes: int = 2) -> Dict[str, float]:
+    # Keeping the order the sweeps chose, rows are first placed top down with each unit as close under its parents'
+    # junction as spacing allows. Later passes, bottom up then top down, also pull couples over their children, so
+    # junction-to-child lines stay short instead of stretching across the row.
+    positions: Dict[str, float] = {}
+
+    def under_parents(offsets: Dict[str, float]) -> List[float]:
+        return [_junction_x(parent_junction[uuid], positions) - offset for uuid, offset in offsets.items()
+                if uuid in parent_junction and all(parent in positions for parent in parent_junction[uuid])]
+
+    def over_children(offsets: Dict[str, float]) -> List[float]:
+        lefts = []
+        for key, children in children_of.items():
+            if all(uuid in offsets for uuid in key):
+                junction_offset = sum(offsets[uuid] for uuid in key) / len(key)
+                lefts.extend(positions[child] - junction_offset for child in children if child in positions)
+        return lefts
+
+    def between(offsets: Dict[str, float]) -> List[float]:
+        return under_parents(offsets) + over_children(offsets)
+
+    for row in rows:
+        positions.update(_spread_row(row, under_parents))
+
+    for _ in range(passes - 1):
+        for row in reversed(rows):
+            positions.update(_spread_row(row, between))
+        for row in rows:
+            positions.update(_spread_row(row, between))
+
+    return positions
+
+
+def _orient_units(row: List[Unit], parent_x: Callable[[Person], Optional[float]]) -> List[Unit]:
+    # Mirror any unit whose members' parents mostly run right to left, e.g. a couple whose mother's family is placed
+    # left of the father's. Mirroring keeps every couple in the unit side by side.
+    oriented = []
+
+    for unit in row:
+        xs = [x for x in (parent_x(member) for member in unit) if x is not None]
+        pairs = [(a, b) for i, a in enumerate(xs) for b in xs[i + 1:]]
+        if sum(1 for a, b in pairs if a > b) > sum(1 for a, b in pairs if a < b):
+            unit = tuple(reversed(unit))
+        oriented.append(unit)
+
+    return oriented
+
+
+def layout_family(people: Iterable[Person], iterations: int = 4) -> dict:
+    people = list(people)
+    if len(people) == 0:
+        return {"people": {}, "junctions": [], "crossings": 0}
+
+    rows = _build_rows(people)
+    junction_rows, parent_junction = _build_junctions(rows)
+
+    children_of: Dict[JunctionKey, List[str]] = {}
+    for child_uuid, key in parent_junction.items():
+        children_of.setdefault(key, []).append(child_uuid)
+
+    def parent_x(r: int) -> Callable[[Person], Optional[float]]:
+        positions = _unit_positions(rows[r - 1])
+
+        def x(person: Person) -> Optional[float]:
+            key = parent_junction.get(person.uuid)
+            if key is None or junction_rows[key] != r - 1:
+                return None
+            return _junction_x(key, positions)
+
+        return x
+
+    def parent_xs(r: int) -> Callable[[Unit], List[float]]:
+        x = parent_x(r)
+        return lambda unit: [member_x for member_x in (x(member) for member in unit) if member_x is not None]
+
+    def child_xs(r: int) -> Callable[[Unit], List[float]]:
+        positions = _unit_positions(rows[r + 1])
+
+        def xs(unit: Unit) -> List[float]:
+            # Every junction in a unit starts with one of its members
+            uuids = {member.uuid for member in unit}
+            return [positions[child_uuid] for key, children in children_of.items() if key[0] in uuids
+                    for child_uuid in children if child_uuid in positions]
+
+        return xs
+
+    best_rows = [list(row) for row in rows]
+    best_crossings = _count_crossings(rows, junction_rows, parent_junction)
+
+    for _ in range(iterations):
+        if best_crossings == 0:
+            break
+
+        # Alternate a downward sweep (order by parents) with an upward one (order by children), keeping the
+        # best ordering seen after either.
+        for r in range(1, len(rows)):
+            rows[r] = _orient_units(_reorder_row(rows[r], parent_xs(r)), parent_x(r))
+
+        crossings = _count_crossings(rows, junction_rows, parent_junction)
+        if crossings < best_crossings:
+            best_rows = [list(row) for row in rows]
+            best_crossings = crossings
+
+        for r in range(len(rows) - 2, -1, -1):
+            rows[r] = _reorder_row(rows[r], child_xs(r))
+
+        crossings = _count_crossings(rows, junction_rows, parent_junction)
+        if crossings < best_crossings:
+            best_rows = [list(row) for row in rows]
+            best_crossings = crossings
+
+    # Center the family on x = 0 and emit compact [x, y] pairs.
+    positions = _place_rows(best_rows, parent_junction, children_of)
+    offset = (max(positions.values()) + min(positions.values())) / 2
+    positions = {uuid: round(x - offset, 2) for uuid, x in positions.items()}
+
+    coordinates: Dict[str, List[float]] = {}
+    for r, row in enumerate(best_rows):
+        for unit in row:
+            for member in unit:
+                coordinates[member.uuid] = [positions[member.uuid], r * GENERATION_SPACING]
+
+    junctions = []
+    for key, r in junction_rows.items():
+        children = sorted(children_of.get(key, []), key=lambda uuid: positions[uuid])
+
+        # A lone parent only needs a junction when children hang from it
+        if len(key) == 2 or children:
+            junctions.append([round(_junction_x(key, positions), 2), r * GENERATION_SPACING, list(key), children])
+
+    junctions.sort(key=lambda junction: (junction[1], junction[0]))
+
+    return {
+        "people": coordinates,
+        # Each junction is [x, y, partner uuids, child uuids]
+        "junctions": junctions,
+        "crossings": best_crossings
+    }
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import re
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
+from enums import TwinType
 
-pattern = re.compile(r"((?:self)|(?:(?:identical )?twin)|(?:sibling(?: \d+)?)|(?:\bfather\b)|(?:grandmother)|"
+pattern = re.compile(r"((?:self)|(?:(?:identical )?twin(?: \d+)?)|(?:sibling(?: \d+)?)|(?:\bfather\b)|(?:grandmother)|"
                      r"(?:grandfather)|(?:paternal)|(?:\bmate\b(?: \d+)?)|(?:child(?: \d+)?)|(?:mother)|(?:maternal))+",
                      re.IGNORECASE)
 
@@ -26,7 +27,7 @@ class Step(object):
         self.direction = direction
         self.index = index
 
-        if index is None and direction == StepDirection.SIBLING or direction == StepDirection.CHILD:
+        if index is None and direction in (StepDirection.SIBLING, StepDirection.CHILD):
             self.index = 1
 
     def __str__(self):
@@ -38,20 +39,23 @@ class Step(object):
 
 class StepSequence(object):
     items: List[Step]
+    # Set when the person at the end of the path is a twin
+    twin: Optional[TwinType]
 
-    def __init__(self, items: List[Step]=None):
+    def __init__(self, items: List[Step]=None, twin: Optional[TwinType]=None):
         if items is None:
             items = []
         self.items = items
+        self.twin = twin
 
     def __str__(self):
-        return ", ".join([str(item) for item in self.items])
+        return ", ".join([str(item) for item in self.items]) + (f" ({self.twin.name.lower()} twin)" if self.twin else "")
 
     def add_item(self, item: Step):
         self.items.append(item)
 
     def __eq__(self, other: StepSequence) -> bool:
-        if len(self.items) != len(other.items):
+        if len(self.items) != len(other.items) or self.twin != other.twin:
             return False
 
         for i in range(len(self.items)):
@@ -74,12 +78,23 @@ def parse_relationship_text(txt: str) -> StepSequence:
 
         spl = front.split(" ")
 
-        if len(spl) == 1 or front == "identical twin":
+        if spl[0] in ("twin", "identical"):
+            # A twin marker describes the person reached so far. Only a trailing one (the person this path leads
+            # to) is kept; one in the middle of a path doesn't change how it is walked.
+            twin = TwinType.IDENTICAL if spl[0] == "identical" else TwinType.FRATERNAL
+            index = int(spl[-1]) if spl[-1].isdigit() else None
+
+            if len(parts) == 0:
+                sequence.twin = twin
+
+                # "Child Identical Twin 2" is the second of the twin children
+                if index is not None and len(sequence.items) > 0 and \
+                        sequence.items[-1].direction in (StepDirection.SIBLING, StepDirection.CHILD):
+                    sequence.items[-1].index = index
+        elif len(spl) == 1:
             # With no index
             if front == "self":
                 pass
-            elif front == "twin" or front == "identical twin":
-                pass
             elif front == "mate":
                 sequence.add_item(Step(StepDirection.MATE))
             elif front == "maternal" or front == "mother" or front == "grandmother":
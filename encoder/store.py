@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from encoder import DATA_DIRECTORY, FILE_NAMES, load_family, Person
+from enums import Gender, Disease
+
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_FAMILIES_PER_SHARD = 4
+
+# A family as load_family returns it, with its file number in front
+Family = Tuple[int, Optional[str], Dict[str, Person]]
+
+
+def person_to_record(person: Person) -> dict:
+    record = person.to_encodable_dict()
+    # The encodable dict only has the parsed disease, but the label is built from the original spelling.
+    record["disease_original"] = person.disease_original
+    return record
+
+
+def people_from_records(records: List[dict]) -> Dict[str, Person]:
+    people: Dict[str, Person] = {}
+
+    for record in records:
+        people[record["uuid"]] = Person(
+            record["file_number"],
+            record["uuid"],
+            record["relationship_to_self"],
+            Gender.MALE if record["sex"] == "M" else Gender.FEMALE,
+            record["is_living"],
+            Disease(record["disease"]) if record["disease"] is not None else None,
+            record["disease_original"],
+            record["age_onset"],
+            record["age_death"]
+        )
+
+    # Relatives are stored as uuids, so link them up once every person in the shard exists.
+    for record in records:
+        person = people[record["uuid"]]
+        person.father = people[record["father"]] if record["father"] else None
+        person.mother = people[record["mother"]] if record["mother"] else None
+        for partnership in record["partnerships"]:
+            person.add_partner(people[partnership["mate"]], partnership["index"])
+        person.mate = people[record["mate"]] if record["mate"] else None
+        person.twin = people[record["twin"]] if record["twin"] else None
+        person.children = [people[uuid] for uuid in record["children"]]
+        person.siblings = [people[uuid] for uuid in record["siblings"]]
+
+    return people
+
+
+def shard_file_name(index: int) -> str:
+    return f"shard-{index:04d}.json"
+
+
+def load_families(directory: str = DATA_DIRECTORY) -> Iterator[Family]:
+    # One family at a time, so a writer never holds more of the cohort than it needs.
+    for i, file_name in enumerate(FILE_NAMES):
+        root_uuid, people = load_family(i + 1, file_name, directory)
+        yield i + 1, root_uuid, people
+
+
+def _write_shard(directory: str, index: int, families: List[Family]) -> dict:
+    shard = {
+        "roots": {str(file_number): root_uuid for file_number, root_uuid, _ in families if root_uuid is not None},
+        "nodes": [person_to_record(person) for _, _, people in families for person in people.values()]
+    }
+
+    with open(os.path.join(directory, shard_file_name(index)), "w") as f:
+        f.write(json.dumps(shard))
+
+    return {
+        "file": shard_file_name(index),
+        "families": [file_number for file_number, _, _ in families],
+        "people": len(shard["nodes"])
+    }
+
+
+def write_shards(families: Iterable[Family],
+                 directory: str,
+                 families_per_shard: int = DEFAULT_FAMILIES_PER_SHARD) -> dict:
+    # Families are range partitioned: shard n holds the n-th run of families_per_shard family ids in sorted order.
+    # They are written a shard at a time as they arrive, so only one shard's families are held in memory.
+    os.makedirs(directory, exist_ok=True)
+
+    shards = []
+    pending: List[Family] = []
+    for family in families:
+        if pending and family[0] <= pending[-1][0]:
+            raise ValueError(f"Families must arrive in increasing order, got {family[0]} after {pending[-1][0]}")
+
+        pending.append(family)
+        if len(pending) == families_per_shard:
+            shards.append(_write_shard(directory, len(shards), pending))
+            pending = []
+
+    if pending:
+        shards.append(_write_shard(directory, len(shards), pending))
+
+    manifest = {
+        "families_per_shard": families_per_shard,
+        "shards": shards
+    }
+
+    # Written last, so a reader never sees a manifest pointing at shards that don't exist yet.
+    with open(os.path.join(directory, MANIFEST_NAME), "w") as f:
+        f.write(json.dumps(manifest))
+
+    return manifest
+
+
+class ShardedStore(object):
+    directory: str
+    manifest: dict
+    loaded_shards: Dict[int, Tuple[Dict[str, str], Dict[str, Person]]]
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.loaded_shards = {}
+
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+
+        self._shard_by_family = {family: index
+                                 for index, shard in enumerate(self.manifest["shards"])
+                                 for family in shard["families"]}
+
+    @property
+    def shard_count(self) -> int:
+        return len(self.manifest["shards"])
+
+    @property
+    def families(self) -> List[int]:
+        return sorted(self._shard_by_family.keys())
+
+    def shard_for_family(self, family: int) -> int:
+        if family not in self._shard_by_family:
+            raise KeyError(family)
+        return self._shard_by_family[family]
+
+    def shards_for_worker(self, worker_index: int, worker_count: int) -> List[int]:
+        # Contiguous shard ranges, with any remainder spread one each over the first workers.
+        if not 0 <= worker_index < worker_count:
+            raise ValueError(worker_index)
+
+        per_worker, remainder = divmod(self.shard_count, worker_count)
+        start = worker_index * per_worker + min(worker_index, remainder)
+        end = start + per_worker + (1 if worker_index < remainder else 0)
+        return list(range(start, end))
+
+    def load_shard(self, index: int) -> Tuple[Dict[str, str], Dict[str, Person]]:
+        if index not in self.loaded_shards:
+            with open(os.path.join(self.directory, self.manifest["shards"][index]["file"])) as f:
+                shard = json.load(f)
+            self.loaded_shards[index] = (shard["roots"], people_from_records(shard["nodes"]))
+
+        return self.loaded_shards[index]
+
+    def unload_shard(self, index: int):
+        self.loaded_shards.pop(index, None)
+
+    def load_shards(self, indices: List[int]) -> Tuple[Dict[str, str], Dict[str, Person]]:
+        roots: Dict[str, str] = {}
+        people: Dict[str, Person] = {}
+
+        for index in indices:
+            shard_roots, shard_people = self.load_shard(index)
+            roots.update(shard_roots)
+            people.update(shard_people)
+
+        return roots, people
+
+    def load_family(self, family: int) -> Tuple[Optional[str], Dict[str, Person]]:
+        shard_roots, shard_people = self.load_shard(self.shard_for_family(family))
+
+        return (shard_roots.get(str(family)),
+                {uuid: person for uuid, person in shard_people.items() if person.file_number == family})
+
+
+if __name__ == "__main__":
+    output_directory = sys.argv[1] if len(sys.argv) > 1 else "shards"
+    manifest = write_shards(load_families(), output_directory)
+
+    print(f"Wrote {len(manifest['shards'])} shards to {output_directory}")
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+import sys
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+# async_app lives at the top of the repository, next to main_app.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import async_app  # noqa: E402
+from encoder import load_family  # noqa: E402
+
+
+class TestAsyncApp(IsolatedAsyncioTestCase):
+    def setUp(self):
+        async_app._family_builds.clear()
+        self.client = async_app.APP.test_client()
+
+    async def test_unknown_family(self):
+        for path in ("/families/0", "/families/21", "/families/0/dot", "/families/21/layout"):
+            response = await self.client.get(path)
+            self.assertEqual(response.status_code, 404, path)
+
+    async def test_etag_includes_encoding_version(self):
+        response = await self.client.get("/families")
+        etag = (await response.get_json())["families"][1]["etag"]
+
+        with patch("async_app.ENCODING_VERSION", async_app.ENCODING_VERSION + 1):
+            response = await self.client.get("/families")
+            self.assertNotEqual((await response.get_json())["families"][1]["etag"], etag)
+
+            response = await self.client.get("/families/2?generation=0", headers={"If-None-Match": f"{etag}-g0"})
+            self.assertEqual(response.status_code, 200)
+
+    async def test_streamed_family(self):
+        # A small chunk size, so the family is split over several chunks.
+        with patch("async_app.JSON_CHUNK_SIZE", 4):
+            response = await self.client.get("/families/3")
+            self.assertEqual(response.status_code, 200)
+            family = json.loads(await response.get_data())
+
+        self.assertIn(family["root"], family["nodes"])
+        self.assertEqual(family["generations"], sorted(family["generations"], reverse=True))
+        self.assertGreater(len(family["nodes"]), 4)
+
+        response = await self.client.get("/families/3?generation=1")
+        generation = json.loads(await response.get_data())
+        self.assertEqual({node["generation"] for node in generation["nodes"].values()}, {1})
+        self.assertTrue(set(generation["nodes"]) < set(family["nodes"]))
+
+    async def test_not_modified(self):
+        response = await self.client.get("/families/2?generation=0")
+        etag = response.headers["ETag"]
+
+        response = await self.client.get("/families/2?generation=0", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(await response.get_data(), b"")
+
+        # Each generation has its own ETag, so another generation's doesn't match.
+        response = await self.client.get("/families/2?generation=1", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    async def test_ids_survive_rebuilds(self):
+        response = await self.client.get("/families/4?generation=0")
+        etag = response.headers["ETag"]
+        cached = json.loads(await response.get_data())
+
+        # As after a restart, or when the next request goes to another worker
+        async_app._family_builds.clear()
+        response = await self.client.get("/families/4?generation=1")
+        parents = json.loads(await response.get_data())["nodes"]
+
+        root = cached["nodes"][cached["root"]]
+        self.assertIn(root["father"], parents)
+        self.assertIn(cached["root"], parents[root["father"]]["children"])
+
+        response = await self.client.get("/families/4?generation=0", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_concurrent_requests_share_one_load(self):
+        with patch("async_app.load_family", wraps=load_family) as load:
+            responses = await asyncio.gather(*[self.client.get(path) for path in
+                                               ("/families/5", "/families/5/dot", "/families/5/layout")])
+
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200])
+        self.assertEqual(load.call_count, 1)
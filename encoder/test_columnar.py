@@ -0,0 +1,39 @@
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import pyarrow.parquet
+
+from columnar import write_parquet
+from enums import Disease
+from fixtures import load_rows
+
+
+FAMILY = [
+    ("Self", "M", "Y"),
+    ("Mate", "F", "Y"),
+    ("Mother", "F", "N", "Lupus", "40", "60"),
+]
+
+
+class TestColumnar(TestCase):
+    def test_write_parquet(self):
+        people = list(load_rows(FAMILY, 2)[1].values()) + list(load_rows(FAMILY, 1)[1].values())
+
+        with TemporaryDirectory() as directory:
+            nodes_path, edges_path = write_parquet(people, directory)
+
+            self.assertEqual(pyarrow.parquet.ParquetFile(nodes_path).metadata.num_row_groups, 2)
+
+            nodes = pyarrow.parquet.read_table(nodes_path, filters=[("family", "=", 2)]).to_pylist()
+            edges = pyarrow.parquet.read_table(edges_path, filters=[("family", "=", 2)]).to_pylist()
+
+        self.assertEqual([node["relationship"] for node in nodes], ["Self", "Mate", "Mother"])
+        self.assertEqual(nodes[2]["disease"], "Lupus")
+        self.assertEqual(nodes[2]["disease_code"], Disease.LUPUS)
+        self.assertTrue(nodes[0]["is_root"])
+
+        ids = {node["relationship"]: node["id"] for node in nodes}
+        self.assertEqual(sorted((edge["kind"], edge["source"], edge["target"], edge["index"]) for edge in edges), [
+            ("mate", ids["Self"], ids["Mate"], 1),
+            ("parent", ids["Mother"], ids["Self"], None),
+        ])
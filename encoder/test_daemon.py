@@ -0,0 +1,109 @@
+import os
+import threading
+from contextlib import redirect_stderr
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import client
+from daemon import Cohort, DaemonServer, handle_command
+from fixtures import write_family
+
+
+FAMILY = [
+    ("Self", "M", "Y"),
+    ("Mother", "F", "N", "Lupus", "40", "60"),
+    ("Father", "M", "Y", "Heart Attack", "50", ""),
+]
+
+
+def touch(directory: str, file_name: str, rows):
+    # Rewritten files can land in the same mtime tick, so move the mtime on explicitly.
+    path = os.path.join(directory, file_name)
+    previous = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    write_family(directory, file_name, rows)
+    os.utime(path, ns=(previous + 10 ** 9, previous + 10 ** 9))
+
+
+class TestDaemon(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        touch(self.directory.name, "F1.txt", FAMILY)
+        touch(self.directory.name, "F2.txt", FAMILY)
+
+        self.cohort = Cohort(self.directory.name)
+        self.cohort.refresh()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_refresh_reloads_only_changed_families(self):
+        first = self.cohort.families[1]
+
+        self.assertEqual(self.cohort.refresh(), 0)
+
+        touch(self.directory.name, "F2.txt", FAMILY + [("Sibling", "F", "Y")])
+        self.assertEqual(self.cohort.refresh(), 1)
+        self.assertIs(self.cohort.families[1], first)
+        self.assertEqual(len(self.cohort.people(2)), 4)
+
+    def test_parse_error_keeps_last_good_family(self):
+        good = self.cohort.families[2]
+
+        touch(self.directory.name, "F2.txt", [("Self", "X", "Y")])
+        self.assertEqual(self.cohort.refresh(), 0)
+        self.assertIs(self.cohort.families[2], good)
+
+        status = handle_command(self.cohort, {"command": "status"})
+        self.assertEqual(status["families"], [1, 2])
+        self.assertIn("2", status["errors"])
+
+        # Errors are swapped rather than edited, so a status being answered while the watcher refreshes can't see
+        # them change.
+        errors = self.cohort.errors
+        touch(self.directory.name, "F2.txt", FAMILY)
+        self.assertEqual(self.cohort.refresh(), 1)
+        self.assertNotIn(2, self.cohort.errors)
+        self.assertIn(2, errors)
+
+    def test_query(self):
+        def query(**filters):
+            nodes = handle_command(self.cohort, dict(command="query", **filters))["nodes"]
+            return sorted((node["file_number"], node["relationship_to_self"]) for node in nodes)
+
+        self.assertEqual(query(relationship="mother"), [(1, "Mother"), (2, "Mother")])
+        self.assertEqual(query(family=2, disease="heart attack"), [(2, "Father")])
+        self.assertEqual(query(family=1, relationship="Mother", disease="Heart Attack"), [])
+        self.assertEqual(len(query(family=3)), 0)
+
+    def test_dot(self):
+        self.assertIn('"Mother\\nLupus"', handle_command(self.cohort, {"command": "dot", "family": 1})["dot"])
+
+        with self.assertRaises(ValueError):
+            handle_command(self.cohort, {"command": "dot", "family": 3})
+
+    def test_client_writes_every_loaded_family(self):
+        # Family 3 never loads, so the loaded families aren't simply 1 to n.
+        touch(self.directory.name, "F4.txt", FAMILY)
+        self.cohort.refresh()
+        self.assertEqual(sorted(self.cohort.families.keys()), [1, 2, 4])
+
+        socket_path = os.path.join(self.directory.name, "daemon.sock")
+        cwd = os.getcwd()
+
+        with DaemonServer(socket_path, self.cohort) as server:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+
+            try:
+                os.chdir(self.directory.name)
+                with redirect_stderr(StringIO()):
+                    self.assertEqual(client.main(["--socket", socket_path, "dot"]), 0)
+            finally:
+                os.chdir(cwd)
+                server.shutdown()
+                thread.join()
+
+        for family in (1, 2, 4):
+            self.assertTrue(os.path.exists(os.path.join(self.directory.name, f"out{family}.gv")))
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "out3.gv")))
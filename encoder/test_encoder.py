@@ -0,0 +1,87 @@
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from fixtures import by_relationship, load_rows, write_family
+from validation import validate_files
+
+
+class TestEncoder(TestCase):
+    def test_twins_and_later_mates(self):
+        root_uuid, people = load_rows([
+            ("Self Twin", "M", "Y"),
+            ("Father Mate 2 Child", "F", "Y"),
+            ("Sibling Twin", "M", "Y"),
+            ("Sibling 2", "F", "Y"),
+            ("Father Mate 2", "F", "Y"),
+            ("Mother", "F", "Y"),
+            ("Father", "M", "Y"),
+            ("Mother Sibling 1 Identical Twin", "F", "Y"),
+            ("Mother Sibling 2 Identical Twin", "F", "Y"),
+        ])
+
+        by = by_relationship(people)
+        me = people[root_uuid]
+        father = by["Father"]
+        mother = by["Mother"]
+        second_mate = by["Father Mate 2"]
+        half_sibling = by["Father Mate 2 Child"]
+
+        self.assertIs(me.twin, by["Sibling Twin"])
+        self.assertIsNone(by["Sibling 2"].twin)
+        self.assertIs(by["Mother Sibling 1 Identical Twin"].twin, by["Mother Sibling 2 Identical Twin"])
+
+        self.assertIs(father.mate, mother)
+        self.assertIs(father.partner(2), second_mate)
+        self.assertIs(second_mate.mate, father)
+        self.assertIs(half_sibling.father, father)
+        self.assertIs(half_sibling.mother, second_mate)
+        self.assertNotIn(half_sibling, mother.children)
+        self.assertNotIn(me, second_mate.children)
+
+    def test_unindexed_mate_after_parent(self):
+        rows = [
+            ("Self", "M", "Y"),
+            ("Mother", "F", "Y"),
+            ("Father", "M", "Y"),
+            ("Father Mate", "F", "Y"),
+            ("Father Mate Child", "M", "Y"),
+        ]
+
+        root_uuid, people = load_rows(rows)
+        by = by_relationship(people)
+        father = by["Father"]
+
+        # Mother is already the father's first partner, so the unindexed mate becomes his second.
+        self.assertIs(father.partner(1), by["Mother"])
+        self.assertIs(father.partner(2), by["Father Mate"])
+        self.assertIs(by["Father Mate Child"].mother, by["Father Mate"])
+        self.assertIs(by["Father Mate Child"].father, father)
+        self.assertIs(people[root_uuid].mother, by["Mother"])
+
+        # The pre-validation pass agrees the file loads.
+        with TemporaryDirectory() as directory:
+            write_family(directory, "F1.txt", rows)
+            self.assertTrue(validate_files(["F1.txt"], directory).ok)
+
+    def test_indexes_listed_out_of_order(self):
+        _, people = load_rows([
+            ("Self", "M", "Y"),
+            ("Mate", "F", "Y"),
+            ("Child 2", "F", "Y"),
+            ("Child 1", "M", "Y"),
+            ("Child 1 Mate", "F", "Y"),
+        ])
+        by = by_relationship(people)
+
+        self.assertIs(by["Child 1 Mate"].mate, by["Child 1"])
+        self.assertIsNone(by["Child 2"].mate)
+
+    def test_missing_self(self):
+        with self.assertRaisesRegex(ValueError, "Family 3 has no Self row"):
+            load_rows([("Mother", "F", "Y"), ("Father", "M", "Y")], 3)
+
+    def test_ids_are_stable_across_loads(self):
+        rows = [("Self", "M", "Y"), ("Mother", "F", "Y")]
+
+        self.assertEqual(set(load_rows(rows, 1)[1]), set(load_rows(rows, 1)[1]))
+        self.assertFalse(set(load_rows(rows, 1)[1]) & set(load_rows(rows, 2)[1]))
@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from enums import Disease
+from fixtures import by_relationship, load_rows
+from gen_dot import generate_dot, clear_dot_cache, DotStyle, _fragment_cache
+
+
+FAMILY = [
+    ("Self", "M", "Y"),
+    ("Mate", "F", "Y"),
+    ("Child", "F", "Y"),
+]
+
+
+class TestGenDot(TestCase):
+    def setUp(self):
+        clear_dot_cache()
+
+    def test_edit_only_regenerates_changed_fragments(self):
+        root_uuid, people = load_rows(FAMILY)
+        generate_dot({"1": root_uuid}, people, 1)
+        self_shape = _fragment_cache[1][("shape", root_uuid)]
+
+        by_relationship(people)["Mate"].update(disease=Disease.LUPUS, disease_original="Lupus")
+        output = generate_dot({"1": root_uuid}, people, 1)
+
+        self.assertIn('"Self" -- "self+mate" -- "Mate\\nLupus";', output)
+        self.assertIn('"Mate\\nLupus" [fontname="helvetica:bold"', output)
+        self.assertIs(_fragment_cache[1][("shape", root_uuid)], self_shape)
+
+    def test_style_change_regenerates_shapes(self):
+        root_uuid, people = load_rows(FAMILY)
+        child = by_relationship(people)["Child"]
+        generate_dot({"1": root_uuid}, people, 1)
+        child_line = _fragment_cache[1][("child", child.uuid)]
+
+        output = generate_dot({"1": root_uuid}, people, 1, DotStyle(male_color="blue"))
+
+        self.assertIn('"Self" [fontname="helvetica:bold", width=2, shape=box, style=filled, regular=1, color="blue"];',
+                      output)
+        self.assertIs(_fragment_cache[1][("child", child.uuid)], child_line)
+
+    def test_reload_drops_only_that_family(self):
+        first_root, first = load_rows(FAMILY, 1)
+        second_root, second = load_rows(FAMILY, 2)
+        generate_dot({"1": first_root}, first, 1)
+        second_output = generate_dot({"2": second_root}, second, 2)
+
+        first_root, first = load_rows([("Self", "M", "Y"), ("Mate", "F", "Y", "Lupus")], 1)
+        clear_dot_cache(1)
+
+        self.assertNotIn(1, _fragment_cache)
+        self.assertIn('"Mate\\nLupus"', generate_dot({"1": first_root}, first, 1))
+        self.assertEqual(generate_dot({"2": second_root}, second, 2), second_output)
+        self.assertEqual(len(_fragment_cache[1]), 5)
+
+    def test_stale_render_after_clear(self):
+        old_root, old = load_rows([("Self", "M", "Y"), ("Mother", "F", "Y", "Lupus")], 1)
+        new_root, new = load_rows([("Self", "M", "Y"), ("Mother", "F", "Y", "Gout")], 1)
+
+        # A render of the old family that finishes after the reload's clear puts its fragments back in the cache.
+        clear_dot_cache(1)
+        generate_dot({"1": old_root}, old, 1)
+        output = generate_dot({"1": new_root}, new, 1)
+
+        self.assertIn('"Mother\\nGout"', output)
+        self.assertNotIn("Lupus", output)
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from encoder import Person
+from enums import Gender, Disease
+from interning import StringTable
+
+
+class TestInterning(TestCase):
+    def test_string_table(self):
+        table = StringTable()
+
+        mother = table.intern("Mother")
+        lupus = table.intern("Lupus")
+
+        self.assertEqual(table.intern("Mother"), mother)
+        self.assertIsNone(table.intern(None))
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.label(mother, lupus), "Mother\\nLupus")
+        self.assertEqual(table.label(mother, None), "Mother")
+        self.assertIs(table.label(mother, lupus), table.label(mother, lupus))
+
+    def test_concurrent_intern(self):
+        table = StringTable()
+        values = [f"Relative {i % 50}" for i in range(5000)]
+
+        with ThreadPoolExecutor(8) as executor:
+            ids = list(executor.map(table.intern, values))
+
+        self.assertEqual(len(table), 50)
+        for value, string_id in zip(values, ids):
+            self.assertEqual(table.lookup(string_id), value)
+
+    def test_people_share_strings(self):
+        a = Person(1, "a", "Mother", Gender.FEMALE, True, Disease.LUPUS, "Lupus", None, None)
+        b = Person(2, "b", "".join(["Moth", "er"]), Gender.FEMALE, True, Disease.LUPUS, "Lupus", None, None)
+
+        self.assertEqual(a.relationship_id, b.relationship_id)
+        self.assertIs(a.relationship_to_self, b.relationship_to_self)
+        self.assertIs(a.path, b.path)
+        self.assertIs(a.label, b.label)
+
+        b.update(relationship_to_self="Father", disease_original=None)
+        self.assertEqual(b.label, "Father")
+        self.assertEqual(b.generation, 1)
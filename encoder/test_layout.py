@@ -0,0 +1,91 @@
+from unittest import TestCase
+
+from fixtures import by_relationship, load_rows
+from layout import layout_family, PERSON_SPACING
+
+
+def junctions_by_partners(layout, by):
+    uuids = {person.uuid: relationship for relationship, person in by.items()}
+    return {tuple(uuids[uuid] for uuid in partners): (x, y, [uuids[uuid] for uuid in children])
+            for x, y, partners, children in layout["junctions"]}
+
+
+class TestLayout(TestCase):
+    def test_layout_family(self):
+        # The sibling is listed after the couple, so the input order crosses the mate's parent line.
+        _, people = load_rows([
+            ("Self", "M", "Y"),
+            ("Mate", "F", "Y"),
+            ("Sibling", "M", "Y"),
+            ("Father", "M", "Y"),
+            ("Mother", "F", "Y"),
+            ("Mate Father", "M", "Y"),
+            ("Mate Mother", "F", "Y"),
+        ])
+        by = by_relationship(people)
+
+        layout = layout_family(people.values())
+        x = {relationship: layout["people"][person.uuid][0] for relationship, person in by.items()}
+
+        self.assertEqual(layout["crossings"], 0)
+        self.assertEqual(layout["people"][by["Father"].uuid][1], 0)
+        self.assertEqual(layout["people"][by["Self"].uuid][1], 1)
+        self.assertLess(x["Sibling"], x["Self"])
+        self.assertLess(x["Self"], x["Mate"])
+
+        junctions = junctions_by_partners(layout, by)
+        self.assertEqual(junctions[("Father", "Mother")][2], ["Sibling", "Self"])
+        self.assertEqual(junctions[("Mate Father", "Mate Mother")][2], ["Mate"])
+        self.assertEqual(junctions[("Self", "Mate")], ((x["Self"] + x["Mate"]) / 2, 1, []))
+
+    def test_second_mate(self):
+        _, people = load_rows([
+            ("Self", "M", "Y"),
+            ("Father", "M", "Y"),
+            ("Mother", "F", "Y"),
+            ("Father Mate 2", "F", "Y"),
+            ("Father Mate 2 Child", "F", "Y"),
+        ])
+        by = by_relationship(people)
+
+        layout = layout_family(people.values())
+        x = {relationship: layout["people"][person.uuid][0] for relationship, person in by.items()}
+        junctions = junctions_by_partners(layout, by)
+
+        # The father sits between his two partners, with a junction and children for each partnership.
+        self.assertEqual(abs(x["Father"] - x["Mother"]), 1)
+        self.assertEqual(abs(x["Father"] - x["Father Mate 2"]), 1)
+        self.assertEqual(junctions[("Father", "Mother")][2], ["Self"])
+        self.assertEqual(junctions[("Father", "Father Mate 2")][2], ["Father Mate 2 Child"])
+        self.assertEqual(junctions[("Father", "Father Mate 2")][0], (x["Father"] + x["Father Mate 2"]) / 2)
+        self.assertEqual(layout["crossings"], 0)
+
+    def test_children_placed_under_parents(self):
+        # With rows packed left to right, the cousins would sit far right of their parents' junction.
+        _, people = load_rows([
+            ("Self", "M", "Y"),
+            ("Sibling", "F", "Y"),
+            ("Father", "M", "Y"),
+            ("Mother", "F", "Y"),
+            ("Father Sibling", "M", "Y"),
+            ("Father Sibling Mate", "F", "Y"),
+            ("Father Sibling Child 1", "F", "Y"),
+            ("Father Sibling Child 2", "M", "Y"),
+            ("Father Sibling Child 3", "M", "Y"),
+            ("Father Sibling Child 4", "M", "Y"),
+            ("Paternal Grandfather", "M", "Y"),
+            ("Paternal Grandmother", "F", "Y"),
+        ])
+
+        layout = layout_family(people.values())
+        coordinates = layout["people"]
+
+        for x, _, _, children in layout["junctions"]:
+            if children:
+                children_x = sum(coordinates[child][0] for child in children) / len(children)
+                self.assertLessEqual(abs(children_x - x), PERSON_SPACING)
+
+        for y in {y for _, y in coordinates.values()}:
+            row = sorted(x for x, person_y in coordinates.values() if person_y == y)
+            for left, right in zip(row, row[1:]):
+                self.assertGreaterEqual(round(right - left, 2), PERSON_SPACING)
@@ -1,5 +1,6 @@
 from unittest import TestCase
 
+from enums import TwinType
 from parsers import parse_relationship_text, StepSequence, StepDirection, Step
 
 
@@ -24,9 +25,24 @@ class TestParsers(TestCase):
 
         self.assertEqual(
             parse_relationship_text("sibling twin"),
-            StepSequence([Step(StepDirection.SIBLING)])
+            StepSequence([Step(StepDirection.SIBLING)], TwinType.FRATERNAL)
         )
 
+        self.assertEqual(
+            parse_relationship_text("Self Identical Twin"),
+            StepSequence([], TwinType.IDENTICAL)
+        )
+
+        self.assertEqual(
+            parse_relationship_text("Child Identical Twin 2"),
+            StepSequence([Step(StepDirection.CHILD, 2)], TwinType.IDENTICAL)
+        )
+
+        # Explicit indexes are kept, rather than reset to the default of 1
+        self.assertEqual(parse_relationship_text("child 2").items[0].index, 2)
+        self.assertEqual(parse_relationship_text("sibling 3 child 2").items[1].index, 2)
+        self.assertEqual(parse_relationship_text("child").items[0].index, 1)
+
         a = parse_relationship_text("sibling 2")
         b = StepSequence([Step(StepDirection.SIBLING, 2)])
 
@@ -56,7 +72,7 @@ class TestParsers(TestCase):
                           Step(StepDirection.SIBLING, 1),
                           Step(StepDirection.CHILD),
                           Step(StepDirection.MATE)
-                          ])
+                          ], TwinType.IDENTICAL)
         )
 
         a = parse_relationship_text("paternal grandfather sibling 1 child 3 father identical twin mate 2 mother child")
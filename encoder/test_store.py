@@ -0,0 +1,46 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from enums import Disease
+from fixtures import by_relationship, load_rows
+from store import write_shards, ShardedStore
+
+
+FAMILY = [
+    ("Self", "M", "Y"),
+    ("Mother", "F", "N", "Lupus", "40", "60"),
+]
+
+
+class TestStore(TestCase):
+    def test_round_trip(self):
+        loaded = []
+
+        def families():
+            for file_number in range(1, 6):
+                loaded.append(file_number)
+                yield (file_number,) + load_rows(FAMILY, file_number)
+
+        with TemporaryDirectory() as directory:
+            manifest = write_shards(families(), directory, families_per_shard=2)
+
+            self.assertEqual(loaded, [1, 2, 3, 4, 5])
+            self.assertEqual([shard["families"] for shard in manifest["shards"]], [[1, 2], [3, 4], [5]])
+            self.assertTrue(os.path.exists(os.path.join(directory, "shard-0002.json")))
+
+            store = ShardedStore(directory)
+            self.assertEqual(store.shards_for_worker(0, 2), [0, 1])
+            self.assertEqual(store.shards_for_worker(1, 2), [2])
+
+            root_uuid, family = store.load_family(4)
+
+            self.assertEqual(list(store.loaded_shards.keys()), [1])
+            self.assertEqual(root_uuid, load_rows(FAMILY, 4)[0])
+            self.assertEqual(len(family), 2)
+
+            me = family[root_uuid]
+            self.assertIs(me.mother, by_relationship(family)["Mother"])
+            self.assertEqual(me.mother.children, [me])
+            self.assertEqual(me.mother.disease, Disease.LUPUS)
+            self.assertEqual(me.mother.label, "Mother\\nLupus")
@@ -0,0 +1,70 @@
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from fixtures import load_rows, write_family
+from validation import validate_files
+
+
+class TestValidation(TestCase):
+    def test_validate_files(self):
+        with TemporaryDirectory() as directory:
+            write_family(directory, "F1.txt", [
+                ("Self", "M", "Y", "", "", ""),
+                ("Mother", "F", "N", "Lupus", "60", "50"),
+                ("Father", "F", "Q", "", "", ""),
+                ("Sibling 1", "X", "Y", "Heart Atack", "", ""),
+                ("Sibling 3", "M", "Y", "", "", ""),
+                ("Mate Mother", "F", "Y", "", "", ""),
+                ("Cousin", "M", "Y", "", "", ""),
+            ])
+            write_family(directory, "F2.txt", [
+                ("Mother", "F", "Y", "", "", ""),
+            ])
+
+            report = validate_files(["F1.txt", "F2.txt"], directory)
+
+        self.assertFalse(report.ok)
+        self.assertEqual(report.counts(), {
+            "bad_sex": 1,
+            "bad_living": 1,
+            "unknown_disease": 1,
+            "onset_after_death": 1,
+            "unparseable_relationship": 1,
+            "missing_root": 1,
+            "unreachable_relationship": 2,
+            "parent_sex_conflict": 1,
+            "index_gap": 1
+        })
+
+        lines = {(issue["code"], issue["file"]): issue["line"] for issue in report.issues}
+        self.assertEqual(lines[("onset_after_death", "F1.txt")], 3)
+        self.assertEqual(lines[("unknown_disease", "F1.txt")], 5)
+
+    def test_agrees_with_loader(self):
+        families = [
+            [("Self", "M", "Y"), ("Mother", "F", "Y"), ("Mother", "F", "N")],
+            [("Self", "M", "Y"), ("Mate 2", "F", "Y"), ("Mate 2", "F", "N")],
+            [("Self", "M", "Y"), ("Mate", "F", "Y"), ("Mate", "F", "N")],
+            [("Self", "M", "Y"), ("Father", "M", "Y"), ("Mother", "F", "Y"), ("Father Mate Child", "F", "Y")],
+            [("Self", "M", "Y"), ("Father", "M", "Y"), ("Father Mate Child", "F", "Y")],
+        ]
+
+        for rows in families:
+            with self.subTest(rows=rows), TemporaryDirectory() as directory:
+                write_family(directory, "F1.txt", rows)
+                report = validate_files(["F1.txt"], directory)
+
+                try:
+                    load_rows(rows)
+                    loads = True
+                except Exception:
+                    loads = False
+
+                self.assertEqual(report.ok, loads, report.issues)
+
+        with TemporaryDirectory() as directory:
+            write_family(directory, "F1.txt", families[0])
+            report = validate_files(["F1.txt"], directory)
+
+        self.assertEqual(report.counts(), {"duplicate_relationship": 1})
+        self.assertEqual(report.issues[0]["line"], 4)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import pandas
+
+from encoder import DATA_DIRECTORY, DISEASE_NAMES, FILE_NAMES
+from parsers import StepDirection, StepSequence, parse_relationship_text
+
+
+# Issue codes, as they appear in the report
+UNKNOWN_DISEASE = "unknown_disease"
+BAD_SEX = "bad_sex"
+BAD_LIVING = "bad_living"
+BAD_AGE = "bad_age"
+ONSET_AFTER_DEATH = "onset_after_death"
+UNPARSEABLE_RELATIONSHIP = "unparseable_relationship"
+UNREACHABLE_RELATIONSHIP = "unreachable_relationship"
+INDEX_GAP = "index_gap"
+PARENT_SEX_CONFLICT = "parent_sex_conflict"
+MISSING_ROOT = "missing_root"
+MULTIPLE_ROOTS = "multiple_roots"
+DUPLICATE_RELATIONSHIP = "duplicate_relationship"
+UNREADABLE_FILE = "unreadable_file"
+
+# The data files have a header row, but its spellings vary ("Disease " has a trailing space), so columns are
+# renamed by position.
+COLUMNS = ["relationship", "sex", "living", "disease", "age_onset", "age_death"]
+
+PathKey = Tuple[Tuple[StepDirection, int], ...]
+
+
+class ValidationReport(object):
+    issues: List[dict]
+
+    def __init__(self, issues: List[dict] = None):
+        if issues is None:
+            issues = []
+        self.issues = issues
+
+    def add(self, code: str, file_name: str, message: str, line: Optional[int] = None,
+            relationship: Optional[str] = None):
+        self.issues.append({
+            "code": code,
+            "file": file_name,
+            "line": line,
+            "relationship": relationship,
+            "message": message
+        })
+
+    @property
+    def ok(self) -> bool:
+        return len(self.issues) == 0
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for issue in self.issues:
+            counts[issue["code"]] = counts.get(issue["code"], 0) + 1
+        return counts
+
+    def to_encodable_dict(self):
+        return {
+            "ok": self.ok,
+            "counts": self.counts(),
+            "issues": self.issues
+        }
+
+
+def read_files(file_names: List[str], directory: str, report: ValidationReport) -> pandas.DataFrame:
+    frames = []
+
+    for i, file_name in enumerate(file_names):
+        try:
+            df = pandas.read_csv(os.path.join(directory, file_name), sep="\t", dtype=str)
+        except (OSError, pandas.errors.ParserError) as e:
+            report.add(UNREADABLE_FILE, file_name, str(e))
+            continue
+
+        if len(df.columns) < len(COLUMNS):
+            report.add(UNREADABLE_FILE, file_name, f"Expected {len(COLUMNS)} columns, found {len(df.columns)}")
+            continue
+
+        # Like the resolver, ignore anything past the known columns (some files have a trailing tab).
+        df = df.iloc[:, :len(COLUMNS)]
+        df.columns = COLUMNS
+        df["file_number"] = i + 1
+        df["file"] = file_name
+        # Line numbers count the header, so they match what an editor shows.
+        df["line"] = range(2, len(df) + 2)
+        frames.append(df)
+
+    if len(frames) == 0:
+        return pandas.DataFrame(columns=COLUMNS + ["file_number", "file", "line"])
+
+    return pandas.concat(frames, ignore_index=True)
+
+
+def _relationship(row) -> Optional[str]:
+    return row.relationship if isinstance(row.relationship, str) else None
+
+
+def _add_rows(report: ValidationReport, rows: pandas.DataFrame, code: str, message: str):
+    for row in rows.itertuples():
+        report.add(code, row.file, message.format(row=row), int(row.line), _relationship(row))
+
+
+def check_fields(df: pandas.DataFrame, report: ValidationReport):
+    # Every column check is a single vectorized pass over the whole cohort.
+    _add_rows(report, df[~df["sex"].isin(["M", "F"])], BAD_SEX, "Sex must be M or F, found {row.sex!r}")
+    _add_rows(report, df[df["living"].notna() & ~df["living"].isin(["Y", "N"])], BAD_LIVING,
+              "Still Living must be Y, N or blank, found {row.living!r}")
+    _add_rows(report, df[df["disease"].notna() & ~df["disease"].isin(DISEASE_NAMES.keys())], UNKNOWN_DISEASE,
+              "Unknown disease {row.disease!r}")
+
+    ages = {}
+    for column in ("age_onset", "age_death"):
+        ages[column] = pandas.to_numeric(df[column], errors="coerce")
+        bad = df[column].notna() & ages[column].isna()
+        _add_rows(report, df[bad], BAD_AGE, f"{column} must be a number, found {{row.{column}!r}}")
+
+    onset_after_death = ages["age_onset"] > ages["age_death"]
+    _add_rows(report, df[onset_after_death], ONSET_AFTER_DEATH,
+              "Age of onset {row.age_onset} is after age of death {row.age_death}")
+
+
+def _path_key(path: StepSequence) -> PathKey:
+    # An unindexed mate is the first mate
+    return tuple((step.direction, step.index if step.index is not None else 1) for step in path.items)
+
+
+def _single_valued(path: StepSequence) -> bool:
+    # A person has one father, one mother and one mate at each index, so a second row for any of them can't be
+    # attached. Unindexed mates are each given the next free partnership instead.
+    step = path.items[-1]
+    return step.direction in (StepDirection.FATHER, StepDirection.MOTHER) or \
+        (step.direction == StepDirection.MATE and step.index is not None)
+
+
+def _reachable(prefix: PathKey, keys: Dict[PathKey, List[tuple]]) -> bool:
+    if prefix in keys:
+        return True
+
+    # Without a row of their own, a parent's first mate is the other parent, e.g. "Father Mate Child" with no
+    # "Father Mate" row is a child of Father and Mother.
+    if len(prefix) >= 2 and prefix[-1] == (StepDirection.MATE, 1):
+        direction, index = prefix[-2]
+        other = {StepDirection.FATHER: StepDirection.MOTHER, StepDirection.MOTHER: StepDirection.FATHER}.get(direction)
+        return other is not None and prefix[:-2] + ((other, index),) in keys
+
+    return False
+
+
+def _describe(key: PathKey) -> str:
+    return " ".join(f"{direction.name.lower()} {index}" for direction, index in key) or "self"
+
+
+def check_relationships(df: pandas.DataFrame, report: ValidationReport):
+    parsed: Dict[str, Optional[StepSequence]] = {}
+
+    for relationship in df["relationship"].dropna().unique():
+        try:
+            path = parse_relationship_text(relationship)
+        except ValueError:
+            path = None
+
+        # The parser skips words it doesn't know, so a relationship made only of those would come out as Self.
+        if path is not None and len(path.items) == 0 and "self" not in relationship.lower():
+            path = None
+
+        parsed[relationship] = path
+
+    for (file_number, file_name), family in df.groupby(["file_number", "file"], sort=True):
+        keys: Dict[PathKey, List[tuple]] = {}
+        rows = []
+
+        for row in family.itertuples():
+            path = parsed.get(row.relationship) if isinstance(row.relationship, str) else None
+            if path is None:
+                report.add(UNPARSEABLE_RELATIONSHIP, file_name, f"Unable to parse relationship {row.relationship!r}",
+                           int(row.line), _relationship(row))
+                continue
+
+            key = _path_key(path)
+            keys.setdefault(key, []).append(row)
+            rows.append((row, key))
+
+        roots = keys.get((), [])
+        if len(roots) == 0:
+            report.add(MISSING_ROOT, file_name, "No Self row")
+        elif len(roots) > 1:
+            report.add(MULTIPLE_ROOTS, file_name, f"{len(roots)} rows resolve to Self",
+                       int(roots[1].line), roots[1].relationship)
+
+        for key, duplicates in keys.items():
+            duplicates = [row for row in duplicates if len(key) > 0 and _single_valued(parsed[row.relationship])]
+            if len(duplicates) > 1:
+                report.add(DUPLICATE_RELATIONSHIP, file_name, f"{len(duplicates)} rows resolve to {_describe(key)}",
+                           int(duplicates[1].line), duplicates[1].relationship)
+
+        indexes: Dict[Tuple[PathKey, StepDirection], set] = {}
+
+        for row, key in rows:
+            # The resolver walks the path from Self, so every shorter prefix has to be somebody in the file.
+            for i in range(len(key)):
+                if not _reachable(key[:i], keys):
+                    report.add(UNREACHABLE_RELATIONSHIP, file_name,
+                               f"No row for intermediate relative ({_describe(key[:i])})",
+                               int(row.line), row.relationship)
+                    break
+
+            if len(key) > 0:
+                direction, index = key[-1]
+                # Mates aren't checked, since a parent's first mate is usually the other parent, who is listed
+                # as Mother or Father rather than Mate 1.
+                if direction in (StepDirection.SIBLING, StepDirection.CHILD):
+                    indexes.setdefault((key[:-1], direction), set()).add(index)
+
+                if (direction == StepDirection.FATHER and row.sex == "F") or \
+                        (direction == StepDirection.MOTHER and row.sex == "M"):
+                    report.add(PARENT_SEX_CONFLICT, file_name,
+                               f"{'Father' if direction == StepDirection.FATHER else 'Mother'} has sex {row.sex}",
+                               int(row.line), row.relationship)
+
+        for (prefix, direction), used in indexes.items():
+            missing = sorted(set(range(1, max(used) + 1)) - used)
+            if missing:
+                report.add(INDEX_GAP, file_name,
+                           f"{direction.name.lower()} indexes {sorted(used)} of {_describe(prefix)} are missing {missing}")
+
+
+def validate_files(file_names: List[str] = None, directory: str = DATA_DIRECTORY) -> ValidationReport:
+    if file_names is None:
+        file_names = FILE_NAMES
+
+    report = ValidationReport()
+    df = read_files(file_names, directory, report)
+
+    check_fields(df, report)
+    check_relationships(df, report)
+
+    return report
+
+
+if __name__ == "__main__":
+    report = validate_files()
+
+    print(json.dumps(report.to_encodable_dict(), indent=2))
+
+    sys.exit(0 if report.ok else 1)
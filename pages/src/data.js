@@ -0,0 +1,133 @@
+// Loads families from the server a generation at a time, caching every fetched subgraph in IndexedDB under the
+// ETag the server sent with it. The family index carries each family's current ETag, so a cached subgraph that is
+// still current is used without any request at all, and a stale one is revalidated with If-None-Match.
+
+const DB_NAME = 'family-trees';
+// Version 2 switched to person ids that are stable across server builds, so version 1 subgraphs are dropped. Changes
+// to the node format don't need a new version, since the server's encoding version is part of every ETag.
+const DB_VERSION = 2;
+const STORE_NAME = 'subgraphs';
+
+function requestToPromise(request) {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function openDatabase() {
+  if (typeof indexedDB === 'undefined') {
+    return Promise.resolve(null);
+  }
+
+  const request = indexedDB.open(DB_NAME, DB_VERSION);
+  request.onupgradeneeded = () => {
+    if (request.result.objectStoreNames.contains(STORE_NAME)) {
+      request.result.deleteObjectStore(STORE_NAME);
+    }
+    request.result.createObjectStore(STORE_NAME, { keyPath: 'url' });
+  };
+
+  // Without IndexedDB (e.g. private browsing) everything still works, just without the cache.
+  return requestToPromise(request).catch(() => null);
+}
+
+function subgraphUrl(familyId, generation) {
+  return `/families/${familyId}?generation=${generation}`;
+}
+
+function quoted(etag) {
+  return `"${etag}"`;
+}
+
+export class FamilyStore {
+  constructor(baseUrl = '') {
+    this.baseUrl = baseUrl;
+    this.database = openDatabase();
+    this.etags = {};
+    this.families = {};
+  }
+
+  async readCached(url) {
+    const db = await this.database;
+    if (!db) {
+      return undefined;
+    }
+
+    const transaction = db.transaction(STORE_NAME, 'readonly');
+    return requestToPromise(transaction.objectStore(STORE_NAME).get(url)).catch(() => undefined);
+  }
+
+  async writeCached(record) {
+    const db = await this.database;
+    if (!db) {
+      return;
+    }
+
+    const transaction = db.transaction(STORE_NAME, 'readwrite');
+    await requestToPromise(transaction.objectStore(STORE_NAME).put(record)).catch(() => undefined);
+  }
+
+  async fetchIndex() {
+    const response = await fetch(this.baseUrl + '/families');
+    const index = await response.json();
+
+    index.families.forEach((family) => {
+      this.etags[family.id] = family.etag;
+    });
+
+    return index.families.map((family) => family.id);
+  }
+
+  async fetchSubgraph(familyId, generation) {
+    const url = subgraphUrl(familyId, generation);
+    const cached = await this.readCached(url);
+    const expectedEtag = quoted(`${this.etags[familyId]}-g${generation}`);
+
+    if (cached && cached.etag === expectedEtag) {
+      return cached.body;
+    }
+
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    const response = await fetch(this.baseUrl + url, { headers });
+
+    if (response.status === 304) {
+      return cached.body;
+    }
+
+    const body = await response.json();
+    await this.writeCached({ url, etag: response.headers.get('ETag'), body });
+    return body;
+  }
+
+  // Opens a family with just the root's generation loaded. Further generations are loaded with expandGeneration.
+  async openFamily(familyId) {
+    if (this.families[familyId]) {
+      return this.families[familyId];
+    }
+
+    const subgraph = await this.fetchSubgraph(familyId, 0);
+    const family = {
+      id: familyId,
+      root: subgraph.root,
+      generations: subgraph.generations,
+      loadedGenerations: [0],
+      nodes: Object.assign({}, subgraph.nodes),
+    };
+
+    this.families[familyId] = family;
+    return family;
+  }
+
+  async expandGeneration(familyId, generation) {
+    const family = await this.openFamily(familyId);
+
+    if (!family.loadedGenerations.includes(generation)) {
+      const subgraph = await this.fetchSubgraph(familyId, generation);
+      family.nodes = Object.assign({}, family.nodes, subgraph.nodes);
+      family.loadedGenerations = family.loadedGenerations.concat([generation]);
+    }
+
+    return family;
+  }
+}
@@ -1,11 +1,69 @@
 import Vue from 'vue';
 
-const app = Vue({
+import { FamilyStore } from './data';
+
+const store = new FamilyStore();
+
+const app = new Vue({
   el: '#vue',
 
-  template: ```
+  data: {
+    familyIds: [],
+    family: null,
+  },
+
+  computed: {
+    people() {
+      if (!this.family) {
+        return [];
+      }
+      return Object.values(this.family.nodes)
+        .sort((a, b) => b.generation - a.generation);
+    },
+  },
+
+  created() {
+    store.fetchIndex().then((familyIds) => {
+      this.familyIds = familyIds;
+    });
+  },
+
+  methods: {
+    openFamily(familyId) {
+      store.openFamily(familyId).then((family) => {
+        this.family = Object.assign({}, family);
+      });
+    },
+
+    expandGeneration(generation) {
+      store.expandGeneration(this.family.id, generation).then((family) => {
+        this.family = Object.assign({}, family);
+      });
+    },
+  },
+
+  template: `
   <div>
-    Hello
+    <label for="family-selector">Select family to load:
+      <select id="family-selector" @change="openFamily(Number($event.target.value))">
+        <option v-for="familyId in familyIds" :value="familyId">Family {{ familyId }}</option>
+      </select>
+    </label>
+
+    <div v-if="family">
+      <button
+        v-for="generation in family.generations"
+        v-if="!family.loadedGenerations.includes(generation)"
+        @click="expandGeneration(generation)">
+        Load generation {{ generation }}
+      </button>
+
+      <ul>
+        <li v-for="person in people" :key="person.uuid">
+          {{ person.relationship_to_self }} (generation {{ person.generation }})
+        </li>
+      </ul>
+    </div>
   </div>
-  ```
-});
\ No newline at end of file
+  `,
+});
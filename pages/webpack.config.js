@@ -4,6 +4,13 @@ module.exports = {
   entry: './src/index.js',
   output: {
     filename: 'main.js',
-    path: path.resolve(__dirname, 'dist'),
+    // Built straight into Flask's static folder so templates/index.html can load it.
+    path: path.resolve(__dirname, '..', 'static', 'js'),
   },
-};
\ No newline at end of file
+  resolve: {
+    alias: {
+      // The full build compiles the string templates used in src/index.js.
+      vue$: 'vue/dist/vue.esm.js',
+    },
+  },
+};